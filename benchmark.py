@@ -0,0 +1,347 @@
+# benchmark.py
+"""
+Micro-benchmarks for the data layer.
+
+Usage:
+    python benchmark.py search [sizes...]
+    python benchmark.py filters [sizes...]
+    python benchmark.py sessions [session counts...]
+    python benchmark.py memory [sizes...]
+    python benchmark.py csv [sizes...]
+    python benchmark.py signin [iteration counts...]
+    python benchmark.py css
+"""
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from generate_initial_data import STATUSES
+
+CATEGORIES = ["TRANSPORT", "HEALTH", "ENERGY", "AI", "Technology", "Social"]
+OWNERS = ["admin", "user1", "user2", "user3", "user4"]
+WORDS = (
+    "ai assistant monitoring research funding machine learning traffic smart city "
+    "energy solar grid chatbot student vision industrial anomaly meter language "
+    "model papers emotion design transport mobility blockchain credential hospital "
+    "iot air quality learning patient wearable mapping disaster plagiarism grant"
+).split()
+
+
+def fake_ideas(n, seed=0):
+    """Builds n random ideas in memory (same shape as data/ideas.csv)"""
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS)
+    start = np.datetime64("2024-01-01")
+    from_dates = start + rng.integers(0, 600, n).astype("timedelta64[D]")
+    descriptions = [" ".join(w) for w in words[rng.integers(0, len(words), (n, 8))]]
+    return pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "Status": rng.choice(STATUSES, n, p=[0.5, 0.3, 0.2]),
+        "From date": from_dates,
+        "To date": from_dates + rng.integers(0, 15, n).astype("timedelta64[D]"),
+        "Date published": from_dates + rng.integers(0, 15, n).astype("timedelta64[D]"),
+        "Name": [f"Project {i}: {w} Innovation" for i, w in zip(range(1, n + 1), words[rng.integers(0, len(words), n)])],
+        "Category": rng.choice(CATEGORIES, n),
+        "Description": descriptions,
+        "Owner": rng.choice(OWNERS, n),
+        "Visibility Setting": rng.choice(["Public", "Private"], n),
+    })
+
+
+def _timed(fn, repeat=5):
+    """Best wall time of fn() in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def bench_search(sizes=(10_000, 100_000, 1_000_000)):
+    """Trigram index vs. the str.contains scan the pages used to run"""
+    from services.search import SearchIndex
+
+    queries = ["smart city", "grant", "project 4242", "zzz"]
+    print(f"{'ideas':>10} {'build':>10} {'query':>14} {'scan ms':>10} {'index ms':>10} {'hits':>8}")
+    for n in sizes:
+        df = fake_ideas(n)
+        # Drafts can be saved without a description
+        df.loc[::50, "Description"] = None
+        t0 = time.perf_counter()
+        index = SearchIndex(df)
+        build_ms = (time.perf_counter() - t0) * 1000
+        # Parquet copies written by older versions hold the text columns
+        # dictionary-encoded, missing values included
+        encoded = SearchIndex(df.astype({"Name": "category", "Description": "category"}))
+
+        for q in queries:
+            def scan():
+                return (
+                    df["Name"].str.lower().str.contains(q, na=False)
+                    | df["Description"].str.lower().str.contains(q, na=False)
+                ).sum()
+
+            hits = len(index.search(q))
+            assert hits == scan() == len(encoded.search(q)), q
+            print(
+                f"{n:>10,} {build_ms:>8.0f}ms {q:>14} "
+                f"{_timed(scan, 3):>10.2f} {_timed(lambda: index.search(q)):>10.2f} {hits:>8,}"
+            )
+
+
+def bench_filters(sizes=(10_000, 100_000, 1_000_000)):
+    """Bitmap + sorted date indexes vs. the column comparisons the pages used to run"""
+    from services.bitmaps import BitmapIndex
+    from services.dates import DateIndex
+
+    start, end = pd.Timestamp("2024-06-01"), pd.Timestamp("2024-09-30")
+    print(f"{'ideas':>10} {'build ms':>10} {'scan ms':>10} {'index ms':>10} {'hits':>8}")
+    for n in sizes:
+        df = fake_ideas(n)
+        t0 = time.perf_counter()
+        bitmaps, dates = BitmapIndex(df), DateIndex(df)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        def scan():
+            return (
+                (df["Status"] == "Accepted") & (df["Category"] == "AI")
+                & (df["From date"] >= start) & (df["To date"] <= end)
+            ).to_numpy()
+
+        def indexed():
+            return (
+                bitmaps.mask({"Status": "Accepted", "Category": "AI"})
+                & dates.mask("From date", start=start) & dates.mask("To date", end=end)
+            )
+
+        assert (scan() == indexed()).all()
+        print(f"{n:>10,} {build_ms:>10.0f} {_timed(scan):>10.2f} {_timed(indexed):>10.2f} {indexed().sum():>8,}")
+
+
+def _allocated():
+    """Bytes allocated right now by Python / NumPy plus Arrow's memory pool"""
+    current, _ = tracemalloc.get_traced_memory()
+    try:
+        import pyarrow as pa
+        current += pa.total_allocated_bytes()
+    except ImportError:
+        pass
+    return current
+
+
+def _memory(build):
+    """Bytes still allocated by whatever build() returns"""
+    before = _allocated()
+    kept = build()
+    used = _allocated() - before
+    del kept
+    return used
+
+
+def bench_sessions(sizes=(500,), n=10_000):
+    """
+    Per-session memory when every session copies the ideas table vs. sessions
+    that keep only the snapshot version and the rows of the page they show
+    """
+    from services.idea_store import IdeaStore
+    from services.query import Query
+    from services.storage import IdeaBackend
+
+    class MemoryBackend(IdeaBackend):
+        def __init__(self, df):
+            self.df = df
+
+        def signature(self):
+            return 0
+
+        def load(self, columns=None):
+            return self.df[[c for c in columns or self.df.columns if c in self.df.columns]]
+
+        def insert(self, row):
+            pass
+
+        def update(self, idea_id, fields):
+            pass
+
+        def delete(self, idea_id):
+            pass
+
+    tracemalloc.start()
+    store = IdeaStore(MemoryBackend(fake_ideas(n)))
+    docs = store.snapshot()
+    pages = {
+        "home": Query(where={"Status": "Accepted", "Visibility Setting": "Public"}),
+        "ideas": Query(where={"Category": "AI"}),
+        "myideas": Query(where={"Owner": "user1"}),
+    }
+    masks = {key: store.query(query, docs).positions for key, query in pages.items()}
+
+    def copying_sessions(count):
+        # What the pages used to do: a table copy per session, then a
+        # copied + filtered frame per page visited
+        sessions = []
+        for _ in range(count):
+            home_docs = docs.copy()
+            state = {"home_docs": home_docs}
+            for key, positions in masks.items():
+                state[key] = home_docs.copy().iloc[positions].reset_index(drop=True)
+            sessions.append(state)
+        return sessions
+
+    def sharing_sessions(count):
+        # Now: paging state and the page on screen
+        sessions = []
+        for _ in range(count):
+            state = {}
+            for key, query in pages.items():
+                state[f"{key}_paging"] = {"page": 0, "sort": [], "filters": query.key()}
+                state[key] = store.query(query.replace(limit=10), docs).rows
+            sessions.append(state)
+        return sessions
+
+    print(f"{n:,} ideas, shared snapshot {docs.memory_usage(deep=True).sum() / 2**20:.1f} MB")
+    print(f"{'sessions':>10} {'copies MB':>10} {'KB/session':>11} {'shared MB':>10} {'KB/session':>11}")
+    for count in sizes:
+        copied = _memory(lambda: copying_sessions(count))
+        shared = _memory(lambda: sharing_sessions(count))
+        print(
+            f"{count:>10,} {copied / 2**20:>10.1f} {copied / count / 1024:>11.1f}"
+            f" {shared / 2**20:>10.1f} {shared / count / 1024:>11.1f}"
+        )
+
+    # Idle sessions can still hold the snapshot they last saw, so updates
+    # shouldn't leave a full table behind for every version
+    updates = 20
+
+    def deep_versions():
+        versions, df = [], docs
+        for i in range(updates):
+            df = df.copy()
+            df.iat[i, df.columns.get_loc("Status")] = "Rejected"
+            versions.append(df)
+        return versions
+
+    def shared_versions():
+        versions = []
+        for i in range(updates):
+            store.update(int(docs["id"].iat[i]), {"Status": "Rejected"})
+            versions.append(store.snapshot())
+        return versions
+
+    print(
+        f"{updates} updates, every version kept: deep copies {_memory(deep_versions) / 2**20:.1f} MB,"
+        f" copy-on-write {_memory(shared_versions) / 2**20:.1f} MB"
+    )
+    tracemalloc.stop()
+
+
+def bench_memory(sizes=(100_000, 1_000_000)):
+    """Resident size of the ideas snapshot: plain columns vs. the store's compact encoding"""
+    from services.idea_store import normalize_ideas
+
+    print(f"{'ideas':>10} {'object MB':>10} {'strings MB':>11} {'compact MB':>11} {'bytes/idea':>11}")
+    for n in sizes:
+        df = fake_ideas(n)
+        # Python object per string and int64 ids (pandas 2 without pyarrow)
+        plain = df.astype({c: object for c in df.columns if df[c].dtype.kind not in "iM"})
+        compact = normalize_ideas(df)
+        sizes_mb = [frame.memory_usage(deep=True).sum() / 2**20 for frame in (plain, df, compact)]
+        print(
+            f"{n:>10,} {sizes_mb[0]:>10.1f} {sizes_mb[1]:>11.1f} {sizes_mb[2]:>11.1f}"
+            f" {sizes_mb[2] * 2**20 / n:>11.0f}"
+        )
+
+
+def bench_csv(sizes=(100_000, 1_000_000)):
+    """Untyped pandas read + date conversions vs. the typed CSV readers"""
+    import os
+    import tempfile
+
+    from services.storage import DATE_COLUMNS, _csv_header, _read_csv_arrow, _read_csv_pandas, pacsv
+
+    def untyped(path):
+        # What loading used to do: no schema, then one conversion per date column
+        df = pd.read_csv(path)
+        for col in DATE_COLUMNS:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        return df
+
+    print(f"{'ideas':>10} {'MB':>6} {'untyped ms':>11} {'typed ms':>10} {'pyarrow ms':>11}")
+    with tempfile.TemporaryDirectory() as folder:
+        for n in sizes:
+            path = os.path.join(folder, f"ideas_{n}.csv")
+            fake_ideas(n).to_csv(path, index=False)
+            columns = _csv_header(path)
+            arrow_ms = "-" if pacsv is None else f"{_timed(lambda: _read_csv_arrow(path, columns), 3):.0f}"
+            print(
+                f"{n:>10,} {os.path.getsize(path) / 2**20:>6.0f}"
+                f" {_timed(lambda: untyped(path), 3):>11.0f}"
+                f" {_timed(lambda: _read_csv_pandas(path, columns), 3):>10.0f} {arrow_ms:>11}"
+            )
+
+
+def bench_signin(sizes=(10_000, 100_000, 600_000), users=64):
+    """Sign-ins per second through the bounded verifier at different hash costs"""
+    import threading
+
+    from services.passwords import PasswordVerifier, hash_password
+
+    print(f"{users} users signing in at once")
+    print(f"{'iterations':>10} {'hash ms':>8} {'sign-ins/s':>11} {'p50 ms':>8} {'p95 ms':>8} {'turned away':>12}")
+    for iterations in sizes:
+        stored = hash_password("correct horse", iterations)
+        single = _timed(lambda: hash_password("correct horse", iterations), 3)
+        verifier = PasswordVerifier()
+        latencies = []
+        start = threading.Barrier(users + 1)
+
+        def sign_in():
+            start.wait()
+            began = time.perf_counter()
+            if verifier.verify("correct horse", stored) is not None:
+                latencies.append((time.perf_counter() - began) * 1000)
+
+        threads = [threading.Thread(target=sign_in) for _ in range(users)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        began = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+        p50, p95 = np.percentile(latencies, [50, 95])
+        print(
+            f"{iterations:>10,} {single:>8.1f} {len(latencies) / elapsed:>11.1f}"
+            f" {p50:>8.0f} {p95:>8.0f} {verifier.metrics()['busy']:>12}"
+        )
+
+
+def bench_css():
+    """Bytes of CSS a full rerun sends per page type: one <style> per sheet vs. the bundle"""
+    from streamlit.proto.Html_pb2 import Html
+    from streamlit.proto.Markdown_pb2 import Markdown
+
+    from styles import bundle
+
+    print(f"{'page type':>10} {'sheets':>7} {'per-sheet B':>12} {'inline B':>9} {'linked B':>9}")
+    for name, sheets in bundle.BUNDLES.items():
+        separate = sum(Markdown(body=f"<style>{css}</style>").ByteSize() for css in sheets)
+        inline = Html(body=f"<style>{bundle._bundles[name]}</style>").ByteSize()
+        linked = Html(body=f'<style>@import url("{bundle._url(name)}");</style>').ByteSize()
+        print(f"{name:>10} {len(sheets):>7} {separate:>12,} {inline:>9,} {linked:>9,}")
+
+
+if __name__ == "__main__":
+    which = sys.argv[1] if len(sys.argv) > 1 else "search"
+    sizes = [int(s) for s in sys.argv[2:]] or None
+    benchmarks = {
+        "search": bench_search, "filters": bench_filters, "sessions": bench_sessions,
+        "memory": bench_memory, "csv": bench_csv, "signin": bench_signin, "css": bench_css,
+    }
+    if which not in benchmarks:
+        sys.exit(f"Unknown benchmark '{which}'. Choose from: {', '.join(benchmarks)}")
+    benchmarks[which](*([sizes] if sizes else []))
@@ -0,0 +1,69 @@
+# pages/assets.py
+"""
+Image URLs for the images pages embed in their own HTML (header logo,
+login pop-ups).
+
+With static file serving on (server.enableStaticServing, see
+.streamlit/config.toml), files under static/ are referenced by URL, so a
+rerun sends a few bytes of markup and the browser fetches the image once
+and revalidates it by ETag after that. The URL carries a hash of the
+file's content, so a changed image is never served from a stale cache.
+
+Without static serving, or for files outside static/, the image goes
+inline as a base64 data URI. Either way each file is read and hashed or
+encoded once per process, and again only when its mtime or size changes.
+"""
+import base64
+import hashlib
+import mimetypes
+import os
+import threading
+
+import streamlit as st
+
+STATIC_DIR = "static"
+
+# path -> ((mtime, size), url hash, data URI or None)
+_assets = {}
+_assets_lock = threading.Lock()
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _static_serving():
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def _asset(path, inline):
+    """(content hash, data URI) for path, read again only when the file changes"""
+    signature = _signature(path)
+    cached = _assets.get(path)
+    if cached is None or cached[0] != signature or (inline and cached[2] is None):
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        uri = None
+        if inline:
+            mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            uri = f"data:{mime};base64,{base64.b64encode(data).decode()}"
+        cached = (signature, digest, uri)
+        with _assets_lock:
+            _assets[path] = cached
+    return cached
+
+
+def image_src(path):
+    """The src for an <img> of path, or "" if the file doesn't exist"""
+    if not os.path.exists(path):
+        return ""
+    relative = os.path.relpath(path, STATIC_DIR).replace(os.sep, "/")
+    if _static_serving() and not relative.startswith(".."):
+        _, digest, _ = _asset(path, inline=False)
+        return f"app/static/{relative}?v={digest}"
+    return _asset(path, inline=True)[2]
@@ -10,42 +10,15 @@ st.set_page_config(
 
 import pandas as pd
 import os
-from pages import header
-from styles import dashboard as dashboard_styles
+from pages import header, idea_tables, paging
+from services import get_store
+from services.query import Query
 from st_aggrid import AgGrid, GridOptionsBuilder
 
-# Reload data from CSV to ensure it's current
-csv_path = "data/ideas.csv"
-if os.path.exists(csv_path):
-    try:
-        df_reload = pd.read_csv(csv_path)
-        for col in ["From date", "To date", "Date published"]:
-            if col in df_reload.columns:
-                df_reload[col] = pd.to_datetime(df_reload[col], errors="coerce")
-        if "id" in df_reload.columns:
-            df_reload = df_reload.sort_values("id", ascending=False).reset_index(drop=True)
-        st.session_state.home_docs = df_reload
-    except Exception as e:
-        st.error(f"Error reloading data: {e}")
-
-
-def get_selected_id(sel):
-    """Extract the selected ID from AgGrid selection"""
-    if isinstance(sel, list):
-        return sel[0].get("id") if len(sel) > 0 else None
-    try:
-        if isinstance(sel, pd.DataFrame):
-            return sel.iloc[0]["id"] if not sel.empty else None
-    except Exception:
-        pass
-    return None
-
+docs = idea_tables.load_snapshot()
 
 # Show the header navigation with "Ideas" as active page
-header.show_header("Ideas")
-
-# Page-specific CSS
-dashboard_styles.load_css()
+header.show_header("Ideas", css="dashboard")
 
 st.markdown('<div class="dashboard-content">', unsafe_allow_html=True)
 
@@ -58,195 +31,202 @@ is_investor = role == "investor"
 is_admin = role == "admin"
 
 # Initialize session state
-if "home_docs" not in st.session_state:
+if docs is None:
     st.warning("No ideas data loaded yet. Please check your data source.")
     st.stop()
 
-# Get base dataframe
-df = st.session_state.home_docs.copy()
 
 # Investor: show only Accepted ideas
-if role == "investor" and "Status" in df.columns:
-    df = df[df["Status"] == "Accepted"].copy()
-
-# VERY IMPORTANT: reset index after the high-level filters
-df = df.reset_index(drop=True)
-
-# Ensure datetime columns
-for c in ["From date", "To date", "Date published"]:
-    if c in df.columns:
-        df[c] = pd.to_datetime(df[c], errors="coerce")
+scope = {}
+if role == "investor" and "Status" in docs.columns:
+    scope["Status"] = "Accepted"
+stats = get_store().stats(docs)
 
 # Flash message from edit
 flash_msg = st.session_state.pop("flash_success", None)
 if flash_msg:
     st.success(flash_msg)
 
-# Filters row
-col_search, col_from, col_to, col_cat = st.columns([3, 1.5, 1.5, 1.5])
-
-with col_search:
-    search = st.text_input("Search (name / description)", key="ideas_search")
-with col_from:
-    from_date = st.date_input("From date", value=None, key="ideas_from")
-with col_to:
-    to_date = st.date_input("To date", value=None, key="ideas_to")
-with col_cat:
-    cat_options = sorted(df["Category"].dropna().unique()) if "Category" in df.columns else []
-    category = st.selectbox("Category", options=["All"] + cat_options, index=0, key="ideas_category")
-
-# Apply filters
-m = pd.Series([True] * len(df))
-if from_date:
-    m &= df["From date"] >= pd.to_datetime(from_date)
-if to_date:
-    m &= df["To date"] <= pd.to_datetime(to_date)
-if category and category != "All":
-    m &= df["Category"] == category
-if search:
-    ql = search.lower()
-    m &= (
-        df["Name"].str.lower().str.contains(ql, na=False)
-        | df["Description"].str.lower().str.contains(ql, na=False)
+# AgGrid configuration
+def _build_grid_options(display_df):
+    """Grid options for this table - built once per role and column schema, see paging.grid_options()"""
+    gb = GridOptionsBuilder.from_dataframe(display_df)
+
+    # Hide ID column but keep for selection
+    if "id" in display_df.columns:
+        gb.configure_column("id", hide=True)
+
+    # Make Short Description wider
+    if "Short Description" in display_df.columns:
+        gb.configure_column("Short Description", width=1000)
+
+    # Configure sortable columns (selection allowed for all roles)
+    if "Title" in display_df.columns:
+        gb.configure_column(
+            field="Title",
+            sortable=True,
+            suppressMenu=True,
+            checkboxSelection=True,
+        )
+    if "Date published" in display_df.columns:
+        gb.configure_column(
+            field="Date published",
+            sortable=True,
+            suppressMenu=True,
+        )
+
+    # Selection configuration – always allow single selection via checkbox
+    gb.configure_selection(
+        selection_mode="single",
+        use_checkbox=True,
     )
-df = df[m].reset_index(drop=True)
 
-st.markdown("</div>", unsafe_allow_html=True)
-
-if len(df) == 0:
-    st.info("No ideas match your filters. Try adjusting your search criteria.")
-    st.stop()
-
-# Prepare display dataframe
-display_df = pd.DataFrame()
-if "id" in df.columns:
-    display_df["id"] = df["id"]
-if "Name" in df.columns:
-    display_df["Title"] = df["Name"]
-if "Date published" in df.columns:
-    display_df["Date published"] = df["Date published"].dt.strftime("%Y-%m-%d")
-if "Description" in df.columns:
-    display_df["Short Description"] = df["Description"]
-if "Category" in df.columns:
-    display_df["Category"] = df["Category"]
-
-# AgGrid configuration
-gb = GridOptionsBuilder.from_dataframe(display_df)
-
-# Hide ID column but keep for selection
-if "id" in display_df.columns:
-    gb.configure_column("id", hide=True)
-
-# Make Short Description wider
-if "Short Description" in display_df.columns:
-    gb.configure_column("Short Description", width=1000)
-
-# Configure sortable columns (selection allowed for all roles)
-if "Title" in display_df.columns:
-    gb.configure_column(
-        field="Title",
-        sortable=True,
-        suppressMenu=True,
-        checkboxSelection=True,
+    grid_opts = gb.build()
+    grid_opts["domLayout"] = "normal"
+    grid_opts["suppressRowClickSelection"] = True
+    grid_opts["rowSelection"] = "single"
+    return grid_opts
+
+
+def _display_frame(rows):
+    """The columns the grid shows for a page of ideas"""
+    display_df = pd.DataFrame()
+    if "id" in rows.columns:
+        display_df["id"] = rows["id"]
+    if "Name" in rows.columns:
+        display_df["Title"] = rows["Name"]
+    if "Date published" in rows.columns:
+        display_df["Date published"] = rows["Date published"].dt.strftime("%Y-%m-%d")
+    if "Description" in rows.columns:
+        display_df["Short Description"] = rows["Description"]
+    if "Category" in rows.columns:
+        display_df["Category"] = rows["Category"]
+    return display_df
+
+
+# Filters, grid and action buttons run as a fragment: changing a filter or
+# selecting a row reruns only this function, not the header and CSS above
+@st.fragment
+def ideas_table():
+    """Filter bar, results grid and actions - changing a filter reruns only this part of the page"""
+    idea_tables.redraw_if_changed(docs)
+
+    # Filters row
+    col_search, col_from, col_to, col_cat = st.columns([3, 1.5, 1.5, 1.5])
+
+    with col_search:
+        search = st.text_input("Search (name / description)", key="ideas_search")
+    with col_from:
+        from_date = st.date_input("From date", value=None, key="ideas_from")
+    with col_to:
+        to_date = st.date_input("To date", value=None, key="ideas_to")
+    with col_cat:
+        cat_options = sorted(stats.by("Category", scope)) if "Category" in docs.columns else []
+        category = st.selectbox("Category", options=["All"] + cat_options, index=0, key="ideas_category")
+
+    # One declarative query - the engine picks the bitmap / date / search indexes
+    query = Query(
+        where={**scope, "Category": None if category == "All" else category},
+        ranges={"From date": (from_date, None), "To date": (None, to_date)},
+        search=search,
     )
-if "Date published" in display_df.columns:
-    gb.configure_column(
-        field="Date published",
-        sortable=True,
-        suppressMenu=True,
+    # Sessions with the same role and filters share the matching rows and
+    # the prepared page, see paging.cached_page()
+    page = paging.cached_page(
+        docs, "ideas", role, query, _display_frame,
+        sort_fields={"Title": "Name", "Date published": "Date published"},
     )
-
-# Selection configuration – always allow single selection via checkbox
-gb.configure_selection(
-    selection_mode="single",
-    use_checkbox=True,
-)
-
-# Build grid options
-grid_opts = gb.build()
-grid_opts["domLayout"] = "normal"
-grid_opts["pagination"] = True
-grid_opts["paginationPageSize"] = 10
-grid_opts["suppressRowClickSelection"] = True
-grid_opts["rowSelection"] = "single"
-
-# Render AgGrid
-resp = AgGrid(
-    display_df,
-    gridOptions=grid_opts,
-    update_on=["selectionChanged"],
-    allow_unsafe_jscode=True,
-    fit_columns_on_grid_load=True,
-    height=520,
-    theme="balham",
-)
-
-# Action buttons
-sel = resp.get("selected_rows", [])
-selected_id = get_selected_id(sel)
-
-c1, c2, c3 = st.columns([1, 1, 1])
-can_modify = role != "investor"
-
-# Everyone can Open -> go to openIdea.py
-with c1:
-    if st.button("🔎 Open", disabled=selected_id is None):
-        st.session_state.open_id = selected_id
-        st.switch_page("pages/openIdea.py")
-
-# Students can edit or delete
-if role in ["admin", "student"]:
-
-    with c2:
-        if st.button("✏️ Edit selected", disabled=(selected_id is None or not can_modify)):
-            st.session_state.edit_id = selected_id
-            st.switch_page("pages/edit_idea.py")
-
-    with c3:
-        if st.button("🗑 Delete", disabled=(selected_id is None or not can_modify)):
-            df_main = st.session_state.home_docs
-            df_main = df_main[df_main["id"] != selected_id]
-            st.session_state.home_docs = df_main.reset_index(drop=True)
-
-            csv_path = "data/ideas.csv"
-            os.makedirs("data", exist_ok=True)
-            df_main.to_csv(csv_path, index=False)
-
-            st.success("Idea deleted successfully!")
-            st.rerun()
-
-# Investors: Save idea to My Ideas (saved list)
-elif role == "investor":
-    with c2:
-        if st.button("💾 Save to My Ideas", disabled=selected_id is None):
-            username = st.session_state.get("username")
-            if not username:
-                st.error("You must be logged in to save ideas.")
-            else:
-                saved_csv = "data/saved_ideas.csv"
-                if os.path.exists(saved_csv):
-                    saved_df = pd.read_csv(saved_csv)
-                else:
-                    saved_df = pd.DataFrame(columns=["username", "idea_id"])
-
-                # Ensure correct dtypes
-                if "idea_id" in saved_df.columns:
-                    saved_df["idea_id"] = pd.to_numeric(saved_df["idea_id"], errors="coerce")
-
-                already = (
-                    (saved_df["username"] == username) &
-                    (saved_df["idea_id"] == selected_id)
-                ).any()
-
-                if already:
-                    st.info("This idea is already in your 'My Ideas'.")
+    if page is None:
+        # A newer search took over
+        return
+    display_df, total = page
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    if total == 0:
+        st.info("No ideas match your filters. Try adjusting your search criteria.")
+        return
+
+    grid_opts = paging.grid_options("ideas", role, display_df, _build_grid_options)
+
+    # Render AgGrid
+    resp = AgGrid(
+        display_df,
+        gridOptions=grid_opts,
+        update_on=["selectionChanged", "sortChanged"],
+        allow_unsafe_jscode=True,
+        fit_columns_on_grid_load=True,
+        height=520,
+        theme="balham",
+        key="ideas_grid",
+    )
+    paging.sync_sort(resp, "ideas")
+    paging.controls("ideas", total)
+
+    # Action buttons
+    sel = resp.get("selected_rows", [])
+    selected_id = idea_tables.get_selected_id(sel)
+
+    c1, c2, c3 = st.columns([1, 1, 1])
+    can_modify = role != "investor"
+
+    # Everyone can Open -> go to openIdea.py
+    with c1:
+        if st.button("🔎 Open", disabled=selected_id is None):
+            st.session_state.open_id = selected_id
+            st.switch_page("pages/openIdea.py")
+
+    # Students can edit or delete
+    if role in ["admin", "student"]:
+
+        with c2:
+            if st.button("✏️ Edit selected", disabled=(selected_id is None or not can_modify)):
+                st.session_state.edit_id = selected_id
+                st.switch_page("pages/edit_idea.py")
+
+        with c3:
+            st.button(
+                "🗑 Delete",
+                disabled=(selected_id is None or not can_modify),
+                on_click=idea_tables.delete_idea,
+                args=(selected_id,),
+            )
+
+    # Investors: Save idea to My Ideas (saved list)
+    elif role == "investor":
+        with c2:
+            if st.button("💾 Save to My Ideas", disabled=selected_id is None):
+                username = st.session_state.get("username")
+                if not username:
+                    st.error("You must be logged in to save ideas.")
                 else:
-                    new_row = {"username": username, "idea_id": selected_id}
-                    saved_df = pd.concat(
-                        [saved_df, pd.DataFrame([new_row])],
-                        ignore_index=True
-                    )
-                    os.makedirs("data", exist_ok=True)
-                    saved_df.to_csv(saved_csv, index=False)
-                    st.success("Idea saved to 'My Ideas'.")
-                    st.switch_page("pages/myideas.py")
\ No newline at end of file
+                    saved_csv = "data/saved_ideas.csv"
+                    if os.path.exists(saved_csv):
+                        saved_df = pd.read_csv(saved_csv)
+                    else:
+                        saved_df = pd.DataFrame(columns=["username", "idea_id"])
+
+                    # Ensure correct dtypes
+                    if "idea_id" in saved_df.columns:
+                        saved_df["idea_id"] = pd.to_numeric(saved_df["idea_id"], errors="coerce")
+
+                    already = (
+                        (saved_df["username"] == username) &
+                        (saved_df["idea_id"] == selected_id)
+                    ).any()
+
+                    if already:
+                        st.info("This idea is already in your 'My Ideas'.")
+                    else:
+                        new_row = {"username": username, "idea_id": selected_id}
+                        saved_df = pd.concat(
+                            [saved_df, pd.DataFrame([new_row])],
+                            ignore_index=True
+                        )
+                        os.makedirs("data", exist_ok=True)
+                        saved_df.to_csv(saved_csv, index=False)
+                        st.success("Idea saved to 'My Ideas'.")
+                        st.switch_page("pages/myideas.py")
+
+
+ideas_table()
@@ -1,9 +1,7 @@
 import streamlit as st
-import pandas as pd
-import os
 from datetime import date
 from pages import header
-from styles import edit_idea as edit_idea
+from services import get_store
 
 # IMPORTANT: page config
 st.set_page_config(
@@ -19,32 +17,27 @@ if role == "investor":
     st.stop()
 
 # Show the header navigation
-header.show_header("My Ideas")
+header.show_header("My Ideas", css="edit_idea")
 
 # --- helpers ---
 def _persist_changes(form, status="On Review", set_date=True):
     """Save the changes to the dataframe, CSV, and head back to My Ideas page."""
     try:
-        df = st.session_state.get("home_docs")
         edit_id = st.session_state.get("edit_id")
-        if df is not None and edit_id is not None and "id" in df.columns:
-            idx = df.index[df["id"] == edit_id]
-            if len(idx) > 0:
-                i = idx[0]
-                df.at[i, "Name"] = (form["title"] or "").strip()
-                df.at[i, "Category"] = form["category"]
-                df.at[i, "Description"] = (form["short_desc"] or "").strip()[:200]
-                df.at[i, "Detailed Description"] = (form["detailed_desc"] or "")
-                df.at[i, "Estimated Impact / Target Audience"] = (form["estimated_impact"] or "")
-                if set_date:
-                    df.at[i, "Date published"] = date.today()
-                df.at[i, "Status"] = status
-                st.session_state.home_docs = df
-
-                # Save to CSV
-                csv_path = "data/ideas.csv"
-                os.makedirs("data", exist_ok=True)
-                df.to_csv(csv_path, index=False)
+        if edit_id is not None:
+            fields = {
+                "Name": (form["title"] or "").strip(),
+                "Category": form["category"],
+                "Description": (form["short_desc"] or "").strip()[:200],
+                "Detailed Description": (form["detailed_desc"] or ""),
+                "Estimated Impact / Target Audience": (form["estimated_impact"] or ""),
+                "Status": status,
+            }
+            if set_date:
+                fields["Date published"] = date.today()
+
+            # Save through the shared store (writes the CSV too)
+            get_store().update(edit_id, fields)
 
     except Exception as e:
         st.error(f"Couldn't save your changes right now. Give it another try? (Error: {e})")
@@ -57,11 +50,6 @@ def _persist_changes(form, status="On Review", set_date=True):
 
 def _get_selected_idea():
     """Grab the selected idea and map it to the form fields."""
-    if "home_docs" not in st.session_state:
-        st.error("Hmm, couldn't load your ideas. Try refreshing the page.")
-        return None
-
-    df = st.session_state.home_docs
     edit_id = st.session_state.get("edit_id")
 
     if edit_id is None:
@@ -69,8 +57,12 @@ def _get_selected_idea():
         return None
 
     try:
-        row = df.loc[df["id"] == edit_id].iloc[0]
+        row = get_store().get(edit_id)
     except Exception:
+        st.error("Hmm, couldn't load your ideas. Try refreshing the page.")
+        return None
+
+    if row is None:
         st.error(f"Could not find idea with ID {edit_id}")
         return None
 
@@ -86,8 +78,6 @@ def _get_selected_idea():
     }
 
 
-# Load the styling to keep input borders consistent
-edit_idea.load_css()
 st.subheader("1. Edit Idea")
 
 # Validation flag
@@ -121,13 +111,8 @@ with c1:
     # Build the category dropdown from existing data plus fallback options
     options = []
     try:
-        options = sorted(
-            set(
-                st.session_state.home_docs.get("Category", pd.Series())
-                .dropna()
-                .astype(str)
-            )
-        )
+        # Categories come from the shared overview counts, not a copy of the table
+        options = sorted({str(c) for c in get_store().stats().by("Category")})
     except Exception:
         pass
     fallback = ["TRANSPORT", "HEALTH", "ENERGY", "AI", "Business", "Technology", "Social"]
@@ -1,14 +1,20 @@
 import os
 import streamlit as st
-from styles import header as header_styles
+from pages import assets
+from styles import load_css
 
 
-def show_header(active_page=None):
-    """Renders the top header and returns the active page name."""
-    header_styles.load_css()
+def show_header(active_page=None, css="header"):
+    """
+    Renders the top header and returns the active page name.
+
+    css is the page's style bundle (see styles/bundle.py) - it includes the
+    header styles, so pages with styles of their own pass theirs here.
+    """
+    load_css(css)
 
     username = st.session_state.get("username", "User")
-    logo_path = "elements/upm_logo.png"
+    logo_path = "static/upm_logo.png"
     is_authenticated = st.session_state.get("authenticated", False)
     role = st.session_state.get("role", None)  # admin / investor / student / None
 
@@ -20,11 +26,9 @@ def show_header(active_page=None):
         lc, rc = st.columns([0.10, 0.90])
         with lc:
             if os.path.exists(logo_path):
-                import base64
-                with open(logo_path, "rb") as f:
-                    logo_b64 = base64.b64encode(f.read()).decode()
+                # A cached URL, not the image itself, see pages/assets.py
                 st.markdown(
-                    f'<img src="data:image/png;base64,{logo_b64}" '
+                    f'<img src="{assets.image_src(logo_path)}" '
                     f'style="width: 100%; max-width: 70px; height: auto; margin-top: 8px;">',
                     unsafe_allow_html=True,
                 )
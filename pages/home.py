@@ -10,24 +10,13 @@ st.set_page_config(
 )
 
 import pandas as pd
-import os
-from pages import header
-from styles.home import load_css
+from pages import header, idea_tables, paging
+from services import get_store
+from services.query import Query
+from styles import load_css
 from st_aggrid import AgGrid, GridOptionsBuilder, JsCode
 
-# CRITICAL: Reload data from CSV BEFORE anything else
-csv_path = "data/ideas.csv"
-if os.path.exists(csv_path):
-    try:
-        df_reload = pd.read_csv(csv_path)
-        for col in ["From date", "To date", "Date published"]:
-            if col in df_reload.columns:
-                df_reload[col] = pd.to_datetime(df_reload[col], errors='coerce')
-        if "id" in df_reload.columns:
-            df_reload = df_reload.sort_values('id', ascending=False).reset_index(drop=True)
-        st.session_state.home_docs = df_reload
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
+docs = idea_tables.load_snapshot()
 
 # Define statuses locally
 STATUSES = ["On Review", "Accepted", "Rejected"]
@@ -37,8 +26,11 @@ is_authenticated = st.session_state.get("authenticated", False)
 
 # Show the header navigation (with or without login)
 if is_authenticated:
-    header.show_header("Home")
+    header.show_header("Home", css="home")
 else:
+    # Home page styles (the header ones come along, see styles/bundle.py)
+    load_css("home")
+
     # Show simplified header for public access
     st.markdown("""
     <div style="background: white; padding: 1rem; margin-bottom: 2rem; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
@@ -59,42 +51,33 @@ else:
     if st.query_params.get("login") == "true":
         st.switch_page("pages/login.py")
 
-# Load custom CSS for home page
-load_css()
-
 # Check if data exists
-if "home_docs" not in st.session_state:
+if docs is None:
     st.error("No data loaded. Please restart the application.")
     st.stop()
 
-# Get base dataframe with datetime conversion
-df = st.session_state.home_docs.copy()
-
 # Role (only meaningful if logged in)
 role = st.session_state.get("role", "student") if is_authenticated else None
 
 # ---- Status / visibility filtering ----
+scope = {}
 if not is_authenticated:
     # Before login: show only Accepted (and Public if column exists)
-    if "Status" in df.columns:
-        df = df[df["Status"] == "Accepted"].copy()
-    if "Visibility Setting" in df.columns:
-        df = df[df["Visibility Setting"] == "Public"].copy()
+    if "Status" in docs.columns:
+        scope["Status"] = "Accepted"
+    if "Visibility Setting" in docs.columns:
+        scope["Visibility Setting"] = "Public"
     st.info("🔓 Viewing public accepted ideas only. Login to see all ideas and manage your own.")
 else:
     # Logged in
-    if role == "investor" and "Status" in df.columns:
+    if role == "investor" and "Status" in docs.columns:
         # Investor: only Accepted ideas
-        df = df[df["Status"] == "Accepted"].copy()
+        scope["Status"] = "Accepted"
     # Students/Admin: no Status filter → they see all ideas
 
-# VERY IMPORTANT: reset index after the high-level filters
-df = df.reset_index(drop=True)
-
-# Convert dates after filtering
-for c in ["From date", "To date", "Date published"]:
-    if c in df.columns:
-        df[c] = pd.to_datetime(df[c], errors='coerce')
+# Overview numbers are kept up to date by the store on every write, so the
+# section below never has to touch the rows themselves
+stats = get_store().stats(docs)
 
 # Flash success message
 flash_msg = st.session_state.pop("flash_success", None)
@@ -109,7 +92,7 @@ st.markdown("### Overview & Statistics")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    total_ideas = len(df)
+    total_ideas = stats.total(scope)
     st.metric(
         label="💡 Total Ideas" + (" (Public)" if not is_authenticated else ""),
         value=total_ideas,
@@ -117,8 +100,8 @@ with col1:
     )
 
 with col2:
-    if "Status" in df.columns:
-        accepted = len(df[df["Status"] == "Accepted"])
+    if "Status" in docs.columns:
+        accepted = stats.total({**scope, "Status": "Accepted"})
         acceptance_rate = f"{(accepted/total_ideas*100):.0f}%" if total_ideas > 0 else "0%"
         st.metric(
             label="✅ Accepted",
@@ -127,8 +110,8 @@ with col2:
         )
 
 with col3:
-    if "Status" in df.columns:
-        on_review = len(df[df["Status"] == "On Review"])
+    if "Status" in docs.columns:
+        on_review = stats.total({**scope, "Status": "On Review"})
         st.metric(
             label="🔄 On Review",
             value=on_review,
@@ -136,8 +119,8 @@ with col3:
         )
 
 with col4:
-    if "Category" in df.columns:
-        categories = df["Category"].nunique()
+    if "Category" in docs.columns:
+        categories = len(stats.by("Category", scope))
         st.metric(
             label="📊 Categories",
             value=categories
@@ -147,28 +130,28 @@ with col4:
 st.markdown("---")
 st.markdown("### 📈 Category Distribution")
 
-if "Category" in df.columns and len(df) > 0:
+if "Category" in docs.columns and total_ideas > 0:
     cat_col1, cat_col2 = st.columns([2, 3])
     
     with cat_col1:
         # Category counts
-        category_counts = df["Category"].value_counts()
+        category_counts = stats.by("Category", scope)
         for cat, count in category_counts.items():
             percentage = (count / total_ideas * 100)
             st.markdown(f"**{cat}**: {count} ideas ({percentage:.1f}%)")
     
     with cat_col2:
         # Status breakdown by category
-        if "Status" in df.columns:
-            status_by_cat = df.groupby(["Category", "Status"]).size().unstack(fill_value=0)
+        if "Status" in docs.columns:
+            status_by_cat = stats.crosstab("Category", "Status", scope)
             st.dataframe(status_by_cat, width="stretch")
 
 # Recent activity
 st.markdown("---")
 st.markdown("### 🕒 Recent Activity")
 
-if "Date published" in df.columns and len(df) > 0:
-    recent_df = df.nlargest(5, "Date published")[["Name", "Category", "Status", "Date published"]]
+if "Date published" in docs.columns and total_ideas > 0:
+    recent_df = get_store().recent_ideas(5, scope, docs)[["Name", "Category", "Status", "Date published"]]
     recent_df["Date published"] = recent_df["Date published"].dt.strftime("%Y-%m-%d")
     st.dataframe(recent_df, width="stretch", hide_index=True)
 
@@ -177,105 +160,131 @@ st.markdown("---")
 # ========== SECTION 2: ALL IDEAS TABLE (BOTTOM) ==========
 st.markdown("### 📋 All Ideas" + (" (Public Only)" if not is_authenticated else ""))
 
-# -------- Filters --------
-filter_cols = st.columns([1.2, 0.4, 0.4, 0.4])
-with filter_cols[0]:
-    q = st.text_input("Search (name / description)", key="home_search")
-with filter_cols[1]:
-    fd = st.date_input("From date", value=None, key="home_from")
-with filter_cols[2]:
-    td = st.date_input("To date", value=None, key="home_to")
-with filter_cols[3]:
-    cat_options = sorted(df["Category"].dropna().unique()) if "Category" in df.columns else []
-    category = st.selectbox("Category", options=["All"] + cat_options, index=0, key="home_category")
-
-# Apply filters
-filtered_df = df.copy()
-m = pd.Series([True] * len(filtered_df))
-if fd:
-    m &= filtered_df["From date"] >= pd.to_datetime(fd)
-if td:
-    m &= filtered_df["To date"] <= pd.to_datetime(td)
-if category and category != "All":
-    m &= filtered_df["Category"] == category
-if q:
-    ql = q.lower()
-    m &= (
-        filtered_df["Name"].str.lower().str.contains(ql, na=False) |
-        filtered_df["Description"].str.lower().str.contains(ql, na=False)
-    )
-filtered_df = filtered_df[m].reset_index(drop=True)
-
-if len(filtered_df) == 0:
-    st.info("No ideas match your filters. Try adjusting your search criteria.")
-    st.stop()
-
-# Show filtered count
-st.caption(f"Showing {len(filtered_df)} of {len(df)} ideas")
-
-# Prepare display dataframe
-display_df = pd.DataFrame()
-if "Name" in filtered_df.columns:
-    display_df["Title"] = filtered_df["Name"]
-if "Date published" in filtered_df.columns:
-    display_df["Date published"] = filtered_df["Date published"].dt.strftime("%Y-%m-%d")
-if "Description" in filtered_df.columns:
-    display_df["Short Description"] = filtered_df["Description"]
-if "Category" in filtered_df.columns:
-    display_df["Category"] = filtered_df["Category"]
-if "Status" in filtered_df.columns:
-    display_df["Status"] = filtered_df["Status"]
-
 # ---- AgGrid configuration ----
-gb = GridOptionsBuilder.from_dataframe(display_df)
-
-# Make Short Description wider
-if "Short Description" in display_df.columns:
-    gb.configure_column("Short Description", width=800)
-
-# Configure sortable columns
-if "Title" in display_df.columns:
-    gb.configure_column(
-        field="Title",
-        sortable=True,
-        suppressMenu=True
+def _build_grid_options(display_df):
+    """Grid options for this table - built once per role and column schema, see paging.grid_options()"""
+    gb = GridOptionsBuilder.from_dataframe(display_df)
+
+    # Hide ID column but keep it as the row id
+    if "id" in display_df.columns:
+        gb.configure_column("id", hide=True)
+
+    # Make Short Description wider
+    if "Short Description" in display_df.columns:
+        gb.configure_column("Short Description", width=800)
+
+    # Configure sortable columns
+    if "Title" in display_df.columns:
+        gb.configure_column(
+            field="Title",
+            sortable=True,
+            suppressMenu=True
+        )
+    if "Date published" in display_df.columns:
+        gb.configure_column(
+            field="Date published",
+            sortable=True,
+            suppressMenu=True
+        )
+
+    # Status column styling
+    if "Status" in display_df.columns:
+        cell_style = JsCode("""
+        function(params){
+            const v = params.value;
+            const base = {'border-radius':'999px','padding':'2px 8px','font-weight':'600','display':'inline-block'};
+            if (v === 'On Review') return {...base, 'background':'#e6f0ff','color':'#1d4ed8', 'textAlign':'center'};
+            if (v === 'Accepted')  return {...base, 'background':'#e9f9ee','color':'#079455', 'textAlign':'center'};
+            if (v === 'Rejected')  return {...base, 'background':'#ffeaea','color':'#ce2b2b', 'textAlign':'center'};
+            return base;
+        }
+        """)
+        gb.configure_column("Status", cellStyle=cell_style)
+
+    # Disable selection
+    gb.configure_selection(selection_mode='disabled')
+
+    grid_opts = gb.build()
+    grid_opts["domLayout"] = "normal"
+    return grid_opts
+
+
+def _display_frame(rows):
+    """The columns the grid shows for a page of ideas"""
+    display_df = pd.DataFrame()
+    if "id" in rows.columns:
+        display_df["id"] = rows["id"]
+    if "Name" in rows.columns:
+        display_df["Title"] = rows["Name"]
+    if "Date published" in rows.columns:
+        display_df["Date published"] = rows["Date published"].dt.strftime("%Y-%m-%d")
+    if "Description" in rows.columns:
+        display_df["Short Description"] = rows["Description"]
+    if "Category" in rows.columns:
+        display_df["Category"] = rows["Category"]
+    if "Status" in rows.columns:
+        display_df["Status"] = rows["Status"]
+    return display_df
+
+
+# Filters and the grid run as a fragment: changing a filter reruns only this
+# function, not the header, CSS and statistics above
+@st.fragment
+def ideas_table():
+    """Filter bar + results grid - typing a filter reruns only this part of the page"""
+    idea_tables.redraw_if_changed(docs)
+
+    # -------- Filters --------
+    filter_cols = st.columns([1.2, 0.4, 0.4, 0.4])
+    with filter_cols[0]:
+        q = st.text_input("Search (name / description)", key="home_search")
+    with filter_cols[1]:
+        fd = st.date_input("From date", value=None, key="home_from")
+    with filter_cols[2]:
+        td = st.date_input("To date", value=None, key="home_to")
+    with filter_cols[3]:
+        cat_options = sorted(stats.by("Category", scope)) if "Category" in docs.columns else []
+        category = st.selectbox("Category", options=["All"] + cat_options, index=0, key="home_category")
+
+    # One declarative query - the engine picks the bitmap / date / search indexes
+    query = Query(
+        where={**scope, "Category": None if category == "All" else category},
+        ranges={"From date": (fd, None), "To date": (None, td)},
+        search=q,
     )
-if "Date published" in display_df.columns:
-    gb.configure_column(
-        field="Date published",
-        sortable=True,
-        suppressMenu=True
+    # Sessions with the same role and filters share the matching rows and
+    # the prepared page, see paging.cached_page()
+    page = paging.cached_page(
+        docs, "home", role, query, _display_frame,
+        sort_fields={"Title": "Name", "Date published": "Date published"},
     )
+    if page is None:
+        # A newer search took over
+        return
+    display_df, total = page
+
+    if total == 0:
+        st.info("No ideas match your filters. Try adjusting your search criteria.")
+        return
+
+    # Show filtered count
+    st.caption(f"Showing {total} of {total_ideas} ideas")
+
+    grid_opts = paging.grid_options("home", role, display_df, _build_grid_options)
+
+    # Render AgGrid
+    resp = AgGrid(
+        display_df,
+        gridOptions=grid_opts,
+        update_on=["sortChanged"],
+        allow_unsafe_jscode=True,
+        fit_columns_on_grid_load=True,
+        height=400,
+        theme="balham",
+        key="home_grid"
+    )
+    paging.sync_sort(resp, "home")
+    paging.controls("home", total)
 
-# Status column styling
-if "Status" in display_df.columns:
-    cell_style = JsCode("""
-    function(params){
-        const v = params.value;
-        const base = {'border-radius':'999px','padding':'2px 8px','font-weight':'600','display':'inline-block'};
-        if (v === 'On Review') return {...base, 'background':'#e6f0ff','color':'#1d4ed8', 'textAlign':'center'};
-        if (v === 'Accepted')  return {...base, 'background':'#e9f9ee','color':'#079455', 'textAlign':'center'};
-        if (v === 'Rejected')  return {...base, 'background':'#ffeaea','color':'#ce2b2b', 'textAlign':'center'};
-        return base;
-    }
-    """)
-    gb.configure_column("Status", cellStyle=cell_style)
-
-# Disable selection
-gb.configure_selection(selection_mode='disabled')
-
-# Build grid options
-grid_opts = gb.build()
-grid_opts["domLayout"] = "normal"
-grid_opts["pagination"] = True
-grid_opts["paginationPageSize"] = 10
-
-# Render AgGrid
-AgGrid(
-    display_df,
-    gridOptions=grid_opts,
-    allow_unsafe_jscode=True,
-    fit_columns_on_grid_load=True,
-    height=400,
-    theme="balham"
-)
+
+ideas_table()
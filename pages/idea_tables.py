@@ -0,0 +1,51 @@
+# pages/idea_tables.py
+"""What the Home, Ideas and My Ideas tables have in common around the grid"""
+import pandas as pd
+import streamlit as st
+
+from services import get_store
+
+
+def load_snapshot():
+    """
+    The shared ideas snapshot - only re-parsed when data/ideas.csv actually
+    changes. None (with an error on the page) if it couldn't be loaded
+    """
+    try:
+        return get_store().snapshot()
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return None
+
+
+def redraw_if_changed(df):
+    """
+    Call first thing in a table fragment: if the ideas changed since the
+    rest of the page was drawn from df, redraw all of it
+    """
+    if get_store().snapshot() is not df:
+        st.rerun()
+
+
+def get_selected_id(sel):
+    """Extract the selected ID from AgGrid selection"""
+    if isinstance(sel, list):
+        return sel[0].get("id") if len(sel) > 0 else None
+    try:
+        if isinstance(sel, pd.DataFrame):
+            return sel.iloc[0]["id"] if not sel.empty else None
+    except Exception:
+        pass
+    return None
+
+
+def publish_idea(idea_id):
+    """Button callback - runs before the rerun, so the grid is drawn once, already updated"""
+    if get_store().update(idea_id, {"Status": "Accepted"}):
+        st.session_state.flash_success = "Idea published successfully!"
+
+
+def delete_idea(idea_id):
+    """Button callback - runs before the rerun, so the grid is drawn once, without the row"""
+    get_store().delete(idea_id)
+    st.session_state.flash_success = "Idea deleted successfully!"
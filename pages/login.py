@@ -8,22 +8,19 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-import pandas as pd
 import os
-from datetime import datetime, timedelta
+from pages import assets
+from services.rate_limit import get_login_limiter
+from services.users import get_user_directory
 from styles import login as login_styles
 
 
 def show_popup_modal(image_path, modal_key="error_modal"):
     """Shows a popup modal with an image - closes when you click outside it"""
     if st.session_state.get(modal_key, False):
-        import base64
-        
-        image_base64 = ""
-        if os.path.exists(image_path):
-            with open(image_path, "rb") as img_file:
-                image_base64 = base64.b64encode(img_file.read()).decode()
-        
+        # Encoded / hashed once per process, see pages/assets.py
+        image_src = assets.image_src(image_path)
+
         modal_id = f"modal_{modal_key}"
         
         st.markdown(f"""
@@ -31,7 +28,7 @@ def show_popup_modal(image_path, modal_key="error_modal"):
             <form method="get" action="?close_modal={modal_key}" style="width: 100%; height: 100%; display: flex; justify-content: center; align-items: center; margin: 0; padding: 0;">
                 <button type="submit" style="position: absolute; width: 100%; height: 100%; background: transparent; border: none; cursor: pointer; padding: 0; margin: 0;"></button>
                 <div class="modal-content" style="position: relative; z-index: 2; pointer-events: auto;">
-                    <img src="data:image/png;base64,{image_base64}" alt="Error" style="max-width: 100%; height: auto; display: block; border-radius: 12px; pointer-events: none;">
+                    <img src="{image_src}" alt="Error" style="max-width: 100%; height: auto; display: block; border-radius: 12px; pointer-events: none;">
                 </div>
             </form>
         </div>
@@ -43,55 +40,18 @@ def show_popup_modal(image_path, modal_key="error_modal"):
             st.rerun()
 
 
-def get_login_attempts_file():
-    return "data/login_attempts.csv"
-
-
-def load_login_attempts():
-    attempts_file = get_login_attempts_file()
-    if os.path.exists(attempts_file):
-        try:
-            df = pd.read_csv(attempts_file)
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-            return df
-        except Exception:
-            return pd.DataFrame(columns=["username", "timestamp"])
-    return pd.DataFrame(columns=["username", "timestamp"])
-
-
-def save_login_attempts(df):
-    attempts_file = get_login_attempts_file()
-    df.to_csv(attempts_file, index=False)
-
-
+# Failed logins are counted in memory by one limiter shared by all sessions
+# and written to data/login_attempts.csv in batches, see services.rate_limit
 def check_rate_limit(username):
-    now = datetime.now()
-    df_attempts = load_login_attempts()
-    user_attempts = df_attempts[df_attempts["username"] == username]
-    recent_attempts = user_attempts[now - user_attempts["timestamp"] < timedelta(minutes=15)]
-    if len(recent_attempts) >= 5:
-        return True
-    df_attempts = df_attempts[now - df_attempts["timestamp"] < timedelta(minutes=15)]
-    save_login_attempts(df_attempts)
-    return False
+    return get_login_limiter().is_limited(username)
 
 
 def add_failed_attempt(username):
-    df_attempts = load_login_attempts()
-    new_attempt = pd.DataFrame(
-        {
-            "username": [username],
-            "timestamp": [datetime.now()],
-        }
-    )
-    df_attempts = pd.concat([df_attempts, new_attempt], ignore_index=True)
-    save_login_attempts(df_attempts)
+    get_login_limiter().add_failure(username)
 
 
 def clear_login_attempts(username):
-    df_attempts = load_login_attempts()
-    df_attempts = df_attempts[df_attempts["username"] != username]
-    save_login_attempts(df_attempts)
+    get_login_limiter().clear(username)
 
 
 # Main page execution (no function wrapper)
@@ -100,35 +60,12 @@ login_styles.load_css()
 os.makedirs("elements", exist_ok=True)
 os.makedirs("data", exist_ok=True)
 
-# Load user database from CSV (ensure role column exists)
-user_db_path = "data/users.csv"
-if not os.path.exists(user_db_path):
-    df = pd.DataFrame(
-        [
-            {
-                "username": "admin",
-                "password": "aA1234",
-                "status": "active",
-                "role": "admin",
-            }
-        ]
-    )
-    df.to_csv(user_db_path, index=False)
-else:
-    df = pd.read_csv(user_db_path)
-    if "role" not in df.columns:
-        # Backfill role column if missing – default to student, admin stays admin
-        df["role"] = df["username"].apply(
-            lambda u: "admin" if str(u).strip().lower() == "admin" else "student"
-        )
-        df.to_csv(user_db_path, index=False)
-
 # Show popups if we've triggered them
 if st.session_state.get("show_rate_limit_modal", False):
-    show_popup_modal("elements/loginRateLimit.png", "show_rate_limit_modal")
+    show_popup_modal("static/loginRateLimit.png", "show_rate_limit_modal")
 
 if st.session_state.get("show_acc_deleted_modal", False):
-    show_popup_modal("elements/loginAccDeleted.png", "show_acc_deleted_modal")
+    show_popup_modal("static/loginAccDeleted.png", "show_acc_deleted_modal")
 
 col1, col2 = st.columns([1, 1], gap="large")
 
@@ -255,25 +192,23 @@ if login:
                 st.session_state.show_rate_limit_modal = True
                 st.rerun()
         else:
-            user_row = df[df["username"] == email]
-
-            if not user_row.empty:
-                account_status = user_row.iloc[0].get("status", "active")
+            # Loaded once per process and kept in a dict, see services.users
+            user = get_user_directory().get(email)
 
-                if account_status != "active":
+            if user is not None:
+                if not user.active:
                     if not st.session_state.get("show_acc_deleted_modal", False):
                         st.session_state.show_acc_deleted_modal = True
                         st.rerun()
                 else:
-                    if user_row.iloc[0]["password"] == password:
-                        # Determine role (admin / investor / student), default to student
-                        raw_role = str(user_row.iloc[0].get("role", "student")).strip().lower()
-                        if raw_role not in ["admin", "investor", "student"]:
-                            raw_role = "student"
-
+                    # Salted hash - waits for one of the verifier's bounded workers
+                    password_ok = get_user_directory().check_password(user, password)
+                    if password_ok is None:
+                        st.session_state.login_error = "Too many people are signing in right now, please try again"
+                    elif password_ok:
                         st.session_state.authenticated = True
                         st.session_state.username = email
-                        st.session_state.role = raw_role
+                        st.session_state.role = user.role
 
                         st.session_state.login_error = ""
                         st.session_state.login_warning = ""
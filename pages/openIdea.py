@@ -8,26 +8,17 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-import pandas as pd
 from pages import header
-from styles import edit_idea as edit_idea  # reuse same CSS
+from services import get_store
 
 
 # Show the header navigation
-header.show_header("Ideas")
-
-# Load styling
-edit_idea.load_css()
+header.show_header("Ideas", css="edit_idea")  # same styles as the edit form
 st.subheader("1. Idea Details")
 
 
 def _get_selected_idea():
     """Read-only version: get idea from open_id and map to fields."""
-    if "home_docs" not in st.session_state:
-        st.error("Hmm, couldn't load ideas. Try refreshing the page.")
-        return None
-
-    df = st.session_state.home_docs
     open_id = st.session_state.get("open_id")
 
     if open_id is None:
@@ -35,8 +26,12 @@ def _get_selected_idea():
         return None
 
     try:
-        row = df.loc[df["id"] == open_id].iloc[0]
+        row = get_store().get(open_id)
     except Exception:
+        st.error("Hmm, couldn't load ideas. Try refreshing the page.")
+        return None
+
+    if row is None:
         st.error(f"Could not find idea with ID {open_id}")
         return None
 
@@ -0,0 +1,182 @@
+# pages/paging.py
+"""
+Server-side paging and cached GridOptions for the AgGrid tables.
+
+The pages describe what they show as a services.query.Query. cached_page()
+runs it against the shared ideas snapshot, sorts the matching rows and
+copies out only the rows of the page being shown, so the grid gets
+PAGE_SIZE rows per rerun instead of the whole table. The grid's own
+pagination and sorting are switched off: clicking a column header just
+reports the new sort model back (sync_sort), and the page buttons under the
+grid move through the pages.
+
+Matching rows, sorted orders and prepared page frames go through the shared
+result cache, so sessions looking at the same table with the same scope and
+filters reuse each other's work.
+
+grid_options() builds each table's GridOptions once per (table, role,
+column schema) for the whole process and hands every rerun a copy. Tables
+with an id column get getRowId, so when a rerun brings new rows (a write,
+another page) the grid applies them as a row transaction instead of
+rebuilding itself.
+"""
+import copy
+import threading
+
+import streamlit as st
+from st_aggrid import JsCode
+from streamlit.errors import StreamlitAPIException
+
+from pages import search_box
+from services import get_store
+from services.query import QueryResult, sort_positions
+from services.result_cache import get_result_cache
+
+PAGE_SIZE = 10
+
+# Keeps the rows in the order we sent them - the real sort happens on the server
+_KEEP_ORDER = JsCode("function(a, b) { return 0; }")
+
+# Stable row ids let the grid diff new row data against what it shows and
+# only redraw rows that were added, changed or removed
+_ROW_ID = JsCode("function(params) { return String(params.data.id); }")
+
+# (table, role, column schema) -> GridOptions dict, shared by all sessions
+_grid_options = {}
+_grid_options_lock = threading.Lock()
+
+
+def _state(key):
+    return st.session_state.setdefault(f"{key}_paging", {"page": 0, "sort": [], "filters": None})
+
+
+def _select(key, filters, total, page_size):
+    """This session's paging state, back on page one if the filters changed"""
+    state = _state(key)
+    if state["filters"] != filters:
+        state["filters"] = filters
+        state["page"] = 0
+    last_page = max((total - 1) // page_size, 0)
+    state["page"] = min(max(state["page"], 0), last_page)
+    return state
+
+
+def _sort(sort_model, sort_fields):
+    """
+    An AgGrid sort model ([{"colId": ..., "sort": "asc" | "desc"}]) as a
+    Query sort. sort_fields maps grid column ids to df columns.
+    """
+    return [
+        (sort_fields[item.get("colId")], item.get("sort") != "desc")
+        for item in sort_model if item.get("colId") in sort_fields
+    ]
+
+
+def cached_page(df, key, scope, query, prepare, sort_fields, page_size=PAGE_SIZE):
+    """
+    Returns (prepared frame of the current page, total matching rows) for
+    query on snapshot df, or None if a newer search took over.
+
+    scope identifies whose view of the table this is (role, owner ...) on
+    top of what the query already says. prepare(rows) turns the rows of a
+    page into the frame shown in the grid. Results are shared between
+    sessions through the result cache, which forgets everything once df is
+    no longer the current snapshot.
+    """
+    cache = get_result_cache()
+    version = get_store().version_of(df)
+    view = (key, scope, query.key())
+
+    positions = cache.get(version, ("rows",) + view)
+    if positions is None:
+        result = search_box.run(key, query, df)
+        if result is None:
+            return None
+        positions = result.positions
+        cache.put(version, ("rows",) + view, positions)
+
+    total = len(positions)
+    state = _select(key, view[1:], total, page_size)
+    sort = _sort(state["sort"], sort_fields)
+    page_key = ("page",) + view + (tuple(sort), state["page"], page_size)
+    page = cache.get(version, page_key)
+    if page is None:
+        ordered = positions
+        if sort:
+            ordered = cache.get(version, ("sorted",) + view + (tuple(sort),))
+            if ordered is None:
+                ordered = sort_positions(df, positions, sort)
+                cache.put(version, ("sorted",) + view + (tuple(sort),), ordered)
+        result = QueryResult(df, ordered, query.replace(sort=sort, offset=state["page"] * page_size, limit=page_size))
+        page = prepare(result.rows)
+        cache.put(version, page_key, page)
+    # AgGrid may add columns to the frame it's given - keep the cached one intact
+    return page.copy(), total
+
+
+def grid_options(key, role, display_df, build):
+    """
+    Returns the GridOptions for table `key` as seen by `role`.
+
+    build(display_df) makes the options the first time a (table, role,
+    column schema) combination shows up; after that every rerun gets a deep
+    copy of the cached dict (AgGrid edits the one it's given) with this
+    session's sort applied. The grid's own paging and sorting are turned off.
+    """
+    schema = tuple((column, str(dtype)) for column, dtype in display_df.dtypes.items())
+    cache_key = (key, role, schema)
+    grid_opts = _grid_options.get(cache_key)
+    if grid_opts is None:
+        grid_opts = build(display_df)
+        grid_opts["pagination"] = False
+        if "id" in display_df.columns:
+            grid_opts["getRowId"] = _ROW_ID
+        for column in grid_opts.get("columnDefs", []):
+            if column.get("sortable"):
+                column["comparator"] = _KEEP_ORDER
+        with _grid_options_lock:
+            grid_opts = _grid_options.setdefault(cache_key, grid_opts)
+
+    grid_opts = copy.deepcopy(grid_opts)
+    sort_model = _state(key)["sort"]
+    if sort_model:
+        grid_opts["initialState"] = {"sort": {"sortModel": sort_model}}
+    return grid_opts
+
+
+def sync_sort(resp, key):
+    """Picks up a sort the user clicked in the grid and reruns with it applied"""
+    grid_state = getattr(resp, "grid_state", None) or {}
+    sort_model = [
+        {"colId": item.get("colId"), "sort": item.get("sort")}
+        for item in (grid_state.get("sort") or {}).get("sortModel", [])
+    ]
+    state = _state(key)
+    if grid_state and sort_model != state["sort"]:
+        state["sort"] = sort_model
+        state["page"] = 0
+        try:
+            # The tables live in fragments - redraw just the table
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
+            # Not in a fragment rerun (e.g. first run after navigating here)
+            st.rerun()
+
+
+def _move(key, step):
+    _state(key)["page"] += step
+
+
+def controls(key, total, page_size=PAGE_SIZE):
+    """Previous / next buttons and a "Page x of y" caption"""
+    state = _state(key)
+    pages = max((total - 1) // page_size + 1, 1)
+    prev_col, info_col, next_col = st.columns([1, 4, 1])
+    with prev_col:
+        st.button("◀ Prev", key=f"{key}_prev", disabled=state["page"] <= 0, on_click=_move, args=(key, -1))
+    with info_col:
+        first = state["page"] * page_size + 1 if total else 0
+        last = min((state["page"] + 1) * page_size, total)
+        st.caption(f"Page {state['page'] + 1} of {pages} · rows {first}-{last} of {total}")
+    with next_col:
+        st.button("Next ▶", key=f"{key}_next", disabled=state["page"] >= pages - 1, on_click=_move, args=(key, 1))
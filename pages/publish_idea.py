@@ -1,14 +1,12 @@
 import streamlit as st
-import pandas as pd
 import time
-import os
 from datetime import date, timedelta
 import random
 from pages import header
-from styles import edit_idea as edit_idea
+from services import get_store
 
 # Show the header navigation
-header.show_header("New Idea")
+header.show_header("New Idea", css="edit_idea")
 
 role = st.session_state.get("role", "student")
 if role == "investor":
@@ -21,8 +19,6 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# Page-specific styling (borders, spacing, etc.)
-edit_idea.load_css()
 st.subheader("1. Idea Submission Form")
 
 # Keep track of validation state and ongoing publish operations
@@ -31,10 +27,6 @@ if "publish_validate" not in st.session_state:
 if "is_publishing" not in st.session_state:
     st.session_state.is_publishing = False
 
-# Ensure we have the ideas table in memory (should be loaded by streamlit_app.py)
-if "home_docs" not in st.session_state:
-    st.session_state.home_docs = pd.DataFrame()
-
 # Session-backed form data so user input survives reruns
 if "publish_form_data" not in st.session_state:
     st.session_state.publish_form_data = {
@@ -55,13 +47,8 @@ c1, c2 = st.columns(2)
 with c1:
     # Build category choices dynamically, then merge with a sensible fallback list
     try:
-        options = sorted(
-            set(
-                st.session_state.home_docs.get("Category", pd.Series())
-                .dropna()
-                .astype(str)
-            )
-        )
+        # Categories come from the shared overview counts, not a copy of the table
+        options = sorted({str(c) for c in get_store().stats().by("Category")})
     except Exception:
         options = []
     fallback = ["TRANSPORT", "HEALTH", "ENERGY", "AI", "Business", "Technology", "Social"]
@@ -168,35 +155,8 @@ st.session_state.publish_form_data["Visibility Setting"] = visibility
 
 # Helper function to save to CSV
 def save_idea_to_csv(new_row):
-    """Save idea to CSV file and update session state"""
-    csv_path = "data/ideas.csv"
-    
-    # Ensure data directory exists
-    os.makedirs("data", exist_ok=True)
-    
-    # Load existing CSV or create new one
-    if os.path.exists(csv_path):
-        df_csv = pd.read_csv(csv_path)
-        # Convert date columns back to datetime
-        for col in ["From date", "To date", "Date published"]:
-            if col in df_csv.columns:
-                df_csv[col] = pd.to_datetime(df_csv[col], errors='coerce')
-    else:
-        df_csv = pd.DataFrame()
-    
-    # Add new row to CSV data
-    df_csv = pd.concat([df_csv, pd.DataFrame([new_row])], ignore_index=True)
-    
-    # Save to CSV
-    df_csv.to_csv(csv_path, index=False)
-    
-    # Update session state by adding to existing data
-    st.session_state.home_docs = pd.concat(
-        [st.session_state.home_docs, pd.DataFrame([new_row])], 
-        ignore_index=True
-    )
-    
-    return df_csv
+    """Save idea through the shared store"""
+    return get_store().insert(new_row)
 
 
 # ------------------ RIGHT COLUMN: TERMS + ACTIONS ------------------ #
@@ -217,32 +177,29 @@ with c2:
                 st.warning("⚠️ Please provide at least an Idea Title to save as draft.")
             else:
                 try:
-                    df = st.session_state.get("home_docs")
-                    # Calculate new ID
-                    new_id = df["id"].max() + 1 if len(df) > 0 and "id" in df.columns else 1
-
                     today = date.today()
                     days_to_add = random.randint(30, 180)
                     to_date = today + timedelta(days=days_to_add)
 
-                    # IMPORTANT: Owner is stored for user-specific filtering
-                    new_row = {
-                        "id": new_id,
-                        "Status": "On Review",
-                        "From date": today,
-                        "To date": to_date,
-                        "Document name": f"DRAFT/{new_id}/{category[:3].upper()}",
-                        "Date published": today,
-                        "Issue Number": f"{new_id}.00/{random.randint(100,999)}PLN",
-                        "Name": (title or "").strip(),
-                        "Category": category,
-                        "Description": (short_desc or "").strip()[:200],
-                        "Detailed Description": (detailed_desc or ""),
-                        "Estimated Impact / Target Audience": (estimated_impact or ""),
-                        "Owner": st.session_state.get("username", "unknown"),
-                    }
-
-                    # Save to CSV
+                    def new_row(new_id):
+                        # IMPORTANT: Owner is stored for user-specific filtering
+                        return {
+                            "id": new_id,
+                            "Status": "On Review",
+                            "From date": today,
+                            "To date": to_date,
+                            "Document name": f"DRAFT/{new_id}/{category[:3].upper()}",
+                            "Date published": today,
+                            "Issue Number": f"{new_id}.00/{random.randint(100,999)}PLN",
+                            "Name": (title or "").strip(),
+                            "Category": category,
+                            "Description": (short_desc or "").strip()[:200],
+                            "Detailed Description": (detailed_desc or ""),
+                            "Estimated Impact / Target Audience": (estimated_impact or ""),
+                            "Owner": st.session_state.get("username", "unknown"),
+                        }
+
+                    # Save to CSV - the store hands out the id
                     save_idea_to_csv(new_row)
 
                     # Reset the form so the user starts clean next time
@@ -286,32 +243,29 @@ with c2:
                 st.rerun()
             else:
                 try:
-                    df = st.session_state.get("home_docs")
-                    # Calculate new ID
-                    new_id = df["id"].max() + 1 if len(df) > 0 and "id" in df.columns else 1
-
                     today = date.today()
                     days_to_add = random.randint(30, 180)
                     to_date = today + timedelta(days=days_to_add)
 
-                    # IMPORTANT: Owner saved here as well
-                    new_row = {
-                        "id": new_id,
-                        "Status": "Accepted",
-                        "From date": today,
-                        "To date": to_date,
-                        "Document name": f"PROFORMA/{new_id}/{category[:3].upper()}",
-                        "Date published": today,
-                        "Issue Number": f"{new_id}.00/{random.randint(100,999)}PLN",
-                        "Name": (title or "").strip(),
-                        "Category": category,
-                        "Description": (short_desc or "").strip()[:200],
-                        "Detailed Description": (detailed_desc or ""),
-                        "Estimated Impact / Target Audience": (estimated_impact or ""),
-                        "Owner": st.session_state.get("username", "unknown"),
-                    }
-
-                    # Save to CSV
+                    def new_row(new_id):
+                        # IMPORTANT: Owner saved here as well
+                        return {
+                            "id": new_id,
+                            "Status": "Accepted",
+                            "From date": today,
+                            "To date": to_date,
+                            "Document name": f"PROFORMA/{new_id}/{category[:3].upper()}",
+                            "Date published": today,
+                            "Issue Number": f"{new_id}.00/{random.randint(100,999)}PLN",
+                            "Name": (title or "").strip(),
+                            "Category": category,
+                            "Description": (short_desc or "").strip()[:200],
+                            "Detailed Description": (detailed_desc or ""),
+                            "Estimated Impact / Target Audience": (estimated_impact or ""),
+                            "Owner": st.session_state.get("username", "unknown"),
+                        }
+
+                    # Save to CSV - the store hands out the id
                     save_idea_to_csv(new_row)
 
                     st.success("🎉 Idea published successfully!")
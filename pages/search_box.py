@@ -0,0 +1,42 @@
+# pages/search_box.py
+"""Runs the tables' queries, debouncing and cancelling the ones typed into a search box"""
+import uuid
+
+import streamlit as st
+
+from services import get_store
+from services.debounce import get_search_debouncer
+
+
+def run(box, query, df):
+    """
+    Runs query (services.query.Query) against snapshot df and returns the
+    QueryResult, or None if a newer search from this box took over.
+
+    A query with a search text only runs once the user has stopped typing
+    for IDEAS_SEARCH_DEBOUNCE_MS. While it waits, and between steps of the
+    search itself, a "Searching..." note is refreshed. Each refresh is an
+    st.* call, which is where Streamlit aborts the run as soon as the user
+    changes the input again - so a query that has been superseded is dropped
+    instead of holding up the newer one.
+    """
+    if not query.search:
+        return get_store().query(query, df)
+
+    session = st.session_state.setdefault("search_session", uuid.uuid4().hex)
+    key = (session, box)
+    debouncer = get_search_debouncer()
+    ticket = debouncer.submit(key)
+
+    result = None
+    try:
+        note = st.empty()
+        tick = lambda: note.caption("🔎 Searching…")
+        if not debouncer.wait(key, ticket, tick):
+            return None
+        result = get_store().query(query, df, cancelled=debouncer.cancelled(key, ticket, tick))
+        note.empty()
+        return result
+    finally:
+        # Also when Streamlit aborts the run, so the key is forgotten either way
+        debouncer.done(key, ticket, finished=result is not None)
@@ -0,0 +1 @@
+from .idea_store import get_store
@@ -0,0 +1,148 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Columns the pages filter on with `column == value`
+BITMAP_COLUMNS = ["Status", "Category", "Visibility Setting", "Owner"]
+
+# Per column, how many value bitmaps we keep (Owner can have thousands of values)
+MAX_BITMAPS_PER_COLUMN = 64
+
+
+class BitmapIndex:
+    """
+    Row bitmaps for the filter columns of one ideas snapshot.
+
+    Each column is kept as an int32 array of dictionary codes lined up with
+    the snapshot's rows. The boolean bitmap for a value is `codes == code`,
+    computed the first time someone asks for it and cached from then on, so
+    a filter such as Status = Accepted AND Category = AI is just an AND of
+    two cached arrays.
+
+    The index is immutable like the snapshot it belongs to: inserted(),
+    updated() and deleted() return a new index for the next snapshot,
+    patching the codes and the cached bitmaps instead of starting over and
+    sharing every array that didn't change.
+    """
+
+    def __init__(self, df=None, columns=BITMAP_COLUMNS):
+        self.size = 0 if df is None else len(df)
+        self._lock = threading.Lock()
+        self._codes = {}
+        self._lookup = {}
+        self._bitmaps = {}
+        if df is None:
+            return
+        for column in columns:
+            if column not in df.columns:
+                continue
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # The snapshot already stores dictionary codes
+                codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+            else:
+                codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            self._codes[column] = codes.astype(np.int32)
+            self._lookup[column] = {value: code for code, value in enumerate(uniques)}
+            self._bitmaps[column] = OrderedDict()
+
+    @property
+    def columns(self):
+        return list(self._codes)
+
+    def _code(self, column, value, add=False):
+        lookup = self._lookup[column]
+        if value is None or (isinstance(value, float) and pd.isna(value)):
+            return -1
+        code = lookup.get(value)
+        if code is None and add:
+            # Older snapshots never see this code, so sharing the dict is fine
+            code = lookup[value] = len(lookup)
+        return -1 if code is None else code
+
+    def bitmap(self, column, value):
+        """Boolean array marking the rows where column == value"""
+        cache = self._bitmaps[column]
+        with self._lock:
+            if value in cache:
+                cache.move_to_end(value)
+                return cache[value]
+        code = self._code(column, value)
+        bits = self._codes[column] == code if code >= 0 else np.zeros(self.size, dtype=bool)
+        with self._lock:
+            cache[value] = bits
+            while len(cache) > MAX_BITMAPS_PER_COLUMN:
+                cache.popitem(last=False)
+        return bits
+
+    def mask(self, filters):
+        """
+        ANDs the bitmaps for `filters` ({column: value or list of values}).
+        A list means any of those values.
+        """
+        result = np.ones(self.size, dtype=bool)
+        for column, value in filters.items():
+            if isinstance(value, (list, tuple, set)):
+                any_of = np.zeros(self.size, dtype=bool)
+                for v in value:
+                    any_of |= self.bitmap(column, v)
+                result &= any_of
+            else:
+                result &= self.bitmap(column, value)
+        return result
+
+    def _derive(self, size):
+        index = BitmapIndex.__new__(BitmapIndex)
+        index.size = size
+        index._lock = threading.Lock()
+        index._codes = dict(self._codes)
+        index._lookup = self._lookup
+        with self._lock:
+            index._bitmaps = {column: OrderedDict(cache) for column, cache in self._bitmaps.items()}
+        return index
+
+    def inserted(self, position, row):
+        """Index for the snapshot with `row` inserted at `position`"""
+        index = self._derive(self.size + 1)
+        for column in self._codes:
+            value = row.get(column)
+            code = self._code(column, value, add=True)
+            index._codes[column] = np.insert(self._codes[column], position, code)
+            cache = index._bitmaps[column]
+            for cached_value, bits in cache.items():
+                cache[cached_value] = np.insert(bits, position, cached_value == value)
+        return index
+
+    def deleted(self, position, old=None):
+        """Index for the snapshot with the row at `position` removed"""
+        index = self._derive(self.size - 1)
+        for column in self._codes:
+            index._codes[column] = np.delete(self._codes[column], position)
+            cache = index._bitmaps[column]
+            for cached_value, bits in cache.items():
+                cache[cached_value] = np.delete(bits, position)
+        return index
+
+    def updated(self, position, fields, old=None):
+        """Index for the snapshot with some fields of the row at `position` changed"""
+        index = self._derive(self.size)
+        for column, value in fields.items():
+            if column not in self._codes:
+                continue
+            old_code = int(self._codes[column][position])
+            new_code = self._code(column, value, add=True)
+            if old_code == new_code:
+                continue
+            codes = self._codes[column].copy()
+            codes[position] = new_code
+            index._codes[column] = codes
+            cache = index._bitmaps[column]
+            for cached_value in list(cache):
+                code = self._code(column, cached_value)
+                if code >= 0 and code in (old_code, new_code):
+                    bits = cache[cached_value].copy()
+                    bits[position] = code == new_code
+                    cache[cached_value] = bits
+        return index
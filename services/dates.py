@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from .storage import DATE_COLUMNS
+
+
+def to_ns(value):
+    """A date / datetime / ISO string as int64 nanoseconds, or None for missing values"""
+    if value is None:
+        return None
+    value = pd.to_datetime(value, errors="coerce", format="ISO8601")
+    if pd.isna(value):
+        return None
+    return int(value.as_unit("ns").value)
+
+
+class DateIndex:
+    """
+    Sorted arrays over the date columns of one ideas snapshot.
+
+    For every column it keeps the dates (int64 ns, missing dates left out) in
+    ascending order next to the row positions they came from, so a range
+    such as `From date >= x` is two binary searches plus a slice of row
+    positions rather than a comparison over the whole column. mask() turns
+    that slice into a boolean row array that ANDs straight into the
+    BitmapIndex masks.
+
+    Like BitmapIndex it's immutable - inserted(), updated() and deleted()
+    return the index for the next snapshot, patched in place of a re-sort.
+    """
+
+    def __init__(self, df=None, columns=DATE_COLUMNS):
+        self.size = 0 if df is None else len(df)
+        self._values = {}
+        self._rows = {}
+        if df is None:
+            return
+        for column in columns:
+            if column not in df.columns:
+                continue
+            stamps = df[column].to_numpy(dtype="datetime64[ns]")
+            present = np.flatnonzero(~np.isnat(stamps))
+            values = stamps[present].astype(np.int64)
+            order = np.argsort(values, kind="stable")
+            self._values[column] = values[order]
+            self._rows[column] = present[order]
+
+    @property
+    def columns(self):
+        return list(self._values)
+
+    def rows(self, column, start=None, end=None):
+        """Row positions where start <= column <= end (either bound may be None)"""
+        values = self._values[column]
+        start, end = to_ns(start), to_ns(end)
+        lo = 0 if start is None else np.searchsorted(values, start, side="left")
+        hi = len(values) if end is None else np.searchsorted(values, end, side="right")
+        return self._rows[column][lo:hi]
+
+    def mask(self, column, start=None, end=None):
+        """Boolean row array for start <= column <= end"""
+        result = np.zeros(self.size, dtype=bool)
+        result[self.rows(column, start, end)] = True
+        return result
+
+    def active(self, start=None, end=None, from_column="From date", to_column="To date"):
+        """
+        Boolean row array of ideas running at some point in [start, end], i.e.
+        From date <= end and To date >= start.
+        """
+        return self.mask(from_column, end=end) & self.mask(to_column, start=start)
+
+    def _derive(self, size):
+        index = DateIndex.__new__(DateIndex)
+        index.size = size
+        index._values = dict(self._values)
+        index._rows = dict(self._rows)
+        return index
+
+    def _without(self, column, position):
+        values, rows = self._values[column], self._rows[column]
+        keep = rows != position
+        return values[keep], rows[keep]
+
+    @staticmethod
+    def _with(values, rows, position, value):
+        if value is None:
+            return values, rows
+        at = np.searchsorted(values, value, side="right")
+        return np.insert(values, at, value), np.insert(rows, at, position)
+
+    def inserted(self, position, row):
+        """Index for the snapshot with `row` inserted at `position`"""
+        index = self._derive(self.size + 1)
+        for column in self._values:
+            rows = self._rows[column]
+            shifted = rows + (rows >= position)
+            index._values[column], index._rows[column] = self._with(
+                self._values[column], shifted, position, to_ns(row.get(column))
+            )
+        return index
+
+    def deleted(self, position, old=None):
+        """Index for the snapshot with the row at `position` removed"""
+        index = self._derive(self.size - 1)
+        for column in self._values:
+            values, rows = self._without(column, position)
+            index._values[column], index._rows[column] = values, rows - (rows > position)
+        return index
+
+    def updated(self, position, fields, old=None):
+        """Index for the snapshot with some fields of the row at `position` changed"""
+        index = self._derive(self.size)
+        for column, value in fields.items():
+            if column not in self._values:
+                continue
+            values, rows = self._without(column, position)
+            index._values[column], index._rows[column] = self._with(values, rows, position, to_ns(value))
+        return index
@@ -0,0 +1,104 @@
+import itertools
+import os
+import threading
+import time
+
+from .singleton import process_wide
+
+# How long a search box waits for the user to stop typing (0 turns it off)
+SEARCH_DEBOUNCE_MS = int(os.environ.get("IDEAS_SEARCH_DEBOUNCE_MS", "300"))
+
+# How often a waiting / running query checks whether it's been superseded
+_POLL_SECONDS = 0.05
+
+
+class Debouncer:
+    """
+    Latest-wins gate for queries typed into a search box.
+
+    Every query gets a ticket from submit(key). wait() sleeps out the
+    debounce delay and reports whether the ticket is still the newest one
+    for its key; callers run the query only if it is, and call done()
+    however it ends - finished, superseded or aborted - so nothing is kept
+    for a key once its query is over. A ticket that is still pending when
+    the next one for the same key is submitted, or that is given up on,
+    never got to finish - it was skipped, either while waiting or cancelled
+    half way through.
+
+    `tick` is how the caller learns about newer input while a query waits
+    or runs: Streamlit, for example, aborts the current run from inside any
+    st.* call once the user has changed a widget again.
+    """
+
+    def __init__(self, delay_ms=SEARCH_DEBOUNCE_MS):
+        self.delay = max(delay_ms, 0) / 1000
+        self._lock = threading.Lock()
+        self._tickets = itertools.count(1)
+        self._latest = {}
+        self._pending = {}
+        self.submitted = 0
+        self.completed = 0
+        self.skipped = 0
+
+    def submit(self, key):
+        """Registers a new query for key and returns its ticket"""
+        with self._lock:
+            if key in self._pending:
+                self.skipped += 1
+            ticket = next(self._tickets)
+            self._latest[key] = ticket
+            self._pending[key] = ticket
+            self.submitted += 1
+            return ticket
+
+    def is_current(self, key, ticket):
+        return self._latest.get(key) == ticket
+
+    def wait(self, key, ticket, tick=None):
+        """Waits out the debounce delay. Returns False if a newer query came in"""
+        deadline = time.monotonic() + self.delay
+        while True:
+            if not self.is_current(key, ticket):
+                return False
+            if tick is not None:
+                tick()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            time.sleep(min(_POLL_SECONDS, remaining))
+
+    def cancelled(self, key, ticket, tick=None):
+        """A callable for long-running queries to poll: True once the ticket is superseded"""
+        def check():
+            if tick is not None:
+                tick()
+            return not self.is_current(key, ticket)
+        return check
+
+    def done(self, key, ticket, finished=True):
+        """Forgets the ticket - its query either finished or was given up on"""
+        with self._lock:
+            if self._pending.get(key) == ticket:
+                del self._pending[key]
+                if finished:
+                    self.completed += 1
+                else:
+                    self.skipped += 1
+            if self._latest.get(key) == ticket:
+                del self._latest[key]
+
+    def metrics(self):
+        """How many queries were submitted, ran to completion and were skipped"""
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "skipped": self.skipped,
+                "pending": len(self._pending),
+            }
+
+
+@process_wide
+def get_search_debouncer():
+    """Returns the process-wide debouncer shared by the search boxes"""
+    return Debouncer()
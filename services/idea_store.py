@@ -0,0 +1,404 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .bitmaps import BitmapIndex
+from .dates import DateIndex
+from .ids import IdIndex
+from .query import QueryResult, run_query
+from .search import SearchIndex
+from .singleton import process_wide
+from .stats import IdeaStats
+from .storage import (
+    CATEGORY_COLUMNS, DATE_COLUMNS, DETAIL_COLUMNS, LIST_COLUMNS, make_backend,
+)
+
+# Successive snapshots share the columns a write didn't touch. pandas 3
+# always works that way; pandas 2 needs Copy-on-Write switched on
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Text columns outside CATEGORY_COLUMNS are dictionary-encoded too once the
+# table has this many rows and at most this share of their values is distinct.
+# Free text is never encoded: it's only searched, not filtered on
+FREE_TEXT_COLUMNS = ["Name", "Description"]
+DICTIONARY_MIN_ROWS = 1000
+DICTIONARY_MAX_UNIQUE = 0.5
+
+# How many ideas' long text fields we keep around after opening them
+DETAILS_CACHE_SIZE = 1024
+
+# Per-snapshot indexes: built on first use, then carried across writes through
+# their inserted() / updated() / deleted() methods
+INDEXES = {"ids": IdIndex, "bitmaps": BitmapIndex, "dates": DateIndex, "stats": IdeaStats}
+
+
+def normalize_ideas(df):
+    """
+    Parses the date columns, stores the table compactly (see compact_ideas)
+    and sorts by id so newest ideas come first
+    """
+    df = df.copy()
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce", format="ISO8601")
+    df = compact_ideas(df)
+    if "id" in df.columns:
+        df = df.sort_values("id", ascending=False)
+    return df.reset_index(drop=True)
+
+
+def compact_ideas(df):
+    """
+    Dictionary-encodes CATEGORY_COLUMNS, and any other text column outside
+    FREE_TEXT_COLUMNS that mostly repeats the same few values, as pandas
+    categoricals: one small integer code per row plus a single copy of each
+    distinct string. Ids are stored as int32 while they fit.
+    """
+    for col in df.columns:
+        series = df[col]
+        if col in FREE_TEXT_COLUMNS and isinstance(series.dtype, pd.CategoricalDtype):
+            # Read back from a Parquet copy written while they were still encoded
+            df[col] = series.astype(series.cat.categories.dtype)
+            continue
+        if col in FREE_TEXT_COLUMNS or isinstance(series.dtype, pd.CategoricalDtype) \
+                or not pd.api.types.is_string_dtype(series):
+            continue
+        if col in CATEGORY_COLUMNS or (
+            len(series) >= DICTIONARY_MIN_ROWS
+            and series.nunique() <= len(series) * DICTIONARY_MAX_UNIQUE
+        ):
+            df[col] = series.astype("category")
+    if "id" in df.columns and pd.api.types.is_integer_dtype(df["id"]) and len(df):
+        if np.iinfo(np.int32).min <= df["id"].min() and df["id"].max() <= np.iinfo(np.int32).max:
+            df["id"] = df["id"].astype(np.int32)
+    return df
+
+
+def _fit_categories(df, values):
+    """
+    Adds the values ({column: value}) that are new to one of df's
+    dictionary-encoded columns to its categories, so they can be written
+    """
+    for col, value in values.items():
+        if col not in df.columns or not isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        if not pd.isna(value) and value not in df[col].cat.categories:
+            df[col] = df[col].cat.add_categories([value])
+    return df
+
+
+class IdeaStore:
+    """
+    One shared copy of the ideas table for the whole server process.
+
+    Every Streamlit session reads the same snapshot, and the backend is only
+    read again when its signature changes (someone else wrote to it) or when
+    we write through the store. `version` goes up every time the snapshot is
+    replaced, so callers can cheaply tell whether anything changed since they
+    last looked.
+
+    Snapshots are shared between sessions - treat them as read-only and
+    make changes through insert / update / delete instead. Those build a new
+    frame and hand the single changed row to the backend. Sessions don't keep
+    a table of their own, and an update's new frame shares all unchanged
+    columns with the previous one.
+
+    The snapshot only holds LIST_COLUMNS, which is all the list pages show.
+    The long text fields (DETAIL_COLUMNS) are fetched per idea by get() when
+    the Open / Edit pages need them, and a small cache keeps recent ones.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or make_backend()
+        self.version = 0
+        self._lock = threading.RLock()
+        # (snapshot frame, {name: index built for it}) - swapped as one object
+        # so readers never pair a frame with another version's indexes
+        self._view = (None, {})
+        # (snapshot frame, its version) - lets readers tell which version
+        # the frame they hold belongs to
+        self._versioned = (None, 0)
+        self._signature = None
+        self._details = OrderedDict()
+        self._search = None
+
+    @property
+    def _df(self):
+        return self._view[0]
+
+    def _replace(self, df, indexes=None):
+        self._view = (df, indexes or {})
+        self._signature = self.backend.signature()
+        self.version += 1
+        self._versioned = (df, self.version)
+        return df
+
+    def _reload(self):
+        self._details.clear()
+        self._search = None
+        df = self.backend.load(columns=LIST_COLUMNS)
+        return self._replace(normalize_ideas(df))
+
+    def snapshot(self):
+        """Returns the current ideas table, re-reading storage only if it changed"""
+        signature = self.backend.signature()
+        if self._df is not None and signature == self._signature:
+            return self._df
+
+        with self._lock:
+            if self._df is None or self.backend.signature() != self._signature:
+                self._reload()
+            return self._df
+
+    def version_of(self, df):
+        """The version of snapshot df, or None if it's no longer the current one"""
+        current, version = self._versioned
+        return version if df is current else None
+
+    def _index(self, name, df=None, rebuild=False):
+        """
+        Returns the `name` index for df (the current snapshot by default).
+        It's built on first use and then kept up to date by every write.
+        """
+        current = self.snapshot()
+        df = current if df is None else df
+        view = self._view
+        if df is not view[0]:
+            # Someone is still holding an older snapshot - index it on the side
+            return INDEXES[name](df)
+        if name in view[1] and not rebuild:
+            return view[1][name]
+        with self._lock:
+            if self._view[0] is not df:
+                return INDEXES[name](df)
+            indexes = self._view[1]
+            if name not in indexes or rebuild:
+                # Build into a new dict so readers never see a half-filled one
+                indexes = dict(indexes, **{name: INDEXES[name](df)})
+                self._view = (df, indexes)
+            return indexes[name]
+
+    def ids(self, df=None):
+        """IdIndex (id -> row position) for df"""
+        return self._index("ids", df)
+
+    def bitmaps(self, df=None):
+        """BitmapIndex over the Status / Category / Visibility / Owner columns of df"""
+        return self._index("bitmaps", df)
+
+    def dates(self, df=None):
+        """DateIndex over the date columns of df"""
+        return self._index("dates", df)
+
+    def stats(self, df=None):
+        """IdeaStats (overview counts and most recent ideas) for df"""
+        return self._index("stats", df)
+
+    def recent_ideas(self, n, filters=None, df=None):
+        """
+        The n most recently published ideas of df (the current snapshot by
+        default), optionally limited by filters on Status / Visibility Setting
+        """
+        df = self.snapshot() if df is None else df
+        ids = self.stats(df).recent_ids(n, filters)
+        if ids is None:
+            # Deletes used up the remembered recent ideas - count them again
+            ids = self._index("stats", df, rebuild=True).recent_ids(n, filters)
+        if len(ids) < n and "Date published" in df.columns:
+            # Like nlargest(), top up with undated ideas (newest id first) -
+            # only happens when the view has fewer than n dated ideas at all
+            undated = self.bitmaps(df).mask(filters or {}) & df["Date published"].isna().to_numpy()
+            ids = ids + df["id"].to_numpy()[undated][: n - len(ids)].tolist()
+        ids_index = self._index("ids", df)
+        return df.iloc[[ids_index.position(i) for i in ids]]
+
+    def active_ideas(self, start=None, end=None):
+        """Ideas whose From date - To date span overlaps [start, end]"""
+        df = self.snapshot()
+        return df[self.dates(df).active(start, end)].reset_index(drop=True)
+
+    def next_id(self):
+        """The id insert() would hand a new idea right now"""
+        df = self.snapshot()
+        if len(df) == 0 or "id" not in df.columns:
+            return 1
+        return int(df["id"].max()) + 1
+
+    def search_ids(self, query, cancelled=None):
+        """
+        Returns the ids of ideas whose Name or Description contains query
+        (case-insensitive), or None if cancelled() said to give up
+        """
+        with self._lock:
+            # Built from the snapshot as of now: writes that land later are
+            # added to it by _reindex()
+            if self._search is None:
+                self._search = SearchIndex(self.snapshot())
+            search = self._search
+        return search.search(query, cancelled)
+
+    def query(self, query, df=None, cancelled=None):
+        """
+        Runs a Query (see services/query.py) and returns its QueryResult, or
+        None if cancelled() said to give up on the text search.
+
+        It's answered from df (the current snapshot by default) and its
+        indexes, whichever backend stores the ideas. Long text columns the
+        snapshot leaves out are fetched for the rows of the page only.
+        """
+        wanted = set(query.columns or [])
+        df = self.snapshot() if df is None else df
+        result = run_query(self, df, query, cancelled)
+        missing = [col for col in DETAIL_COLUMNS if col in wanted and col not in df.columns]
+        if result is not None and missing:
+            # The long text fields aren't in the snapshot - fetch them for the page only
+            rows = result.rows.copy()
+            details = [self.get_details(idea_id) for idea_id in rows["id"]]
+            for col in missing:
+                rows[col] = [d.get(col) for d in details]
+            result = QueryResult(df, result.positions, query, rows=rows)
+        return result
+
+    def _reindex(self, idea_id, df):
+        """Keeps the search index in step with a changed / deleted idea"""
+        if self._search is None:
+            return
+        position = self._position(df, idea_id)
+        if position is None:
+            self._search.remove(idea_id)
+        else:
+            row = df.iloc[position]
+            self._search.add(idea_id, row.get("Name"), row.get("Description"))
+
+    def _position(self, df, idea_id):
+        """Row position of idea_id in df, or None"""
+        return self.ids(df).position(idea_id)
+
+    def get_details(self, idea_id):
+        """Returns the long text fields of one idea, loading them on first use"""
+        self.snapshot()
+        with self._lock:
+            if idea_id in self._details:
+                self._details.move_to_end(idea_id)
+                return self._details[idea_id]
+            version = self.version
+        # Read without the lock - for the CSV backend that can mean loading
+        # every long text column, and writes shouldn't wait for it
+        details = self.backend.load_row(idea_id, DETAIL_COLUMNS) or {}
+        # The same long text often comes back for many ideas (templates,
+        # generated data) - keep a single copy of each
+        details = {c: sys.intern(v) if isinstance(v, str) else v for c, v in details.items()}
+        with self._lock:
+            # A write in the meantime may have changed them - return what was
+            # read, but don't cache it
+            if self.version == version:
+                self._details[idea_id] = details
+                while len(self._details) > DETAILS_CACHE_SIZE:
+                    self._details.popitem(last=False)
+        return details
+
+    def get(self, idea_id):
+        """Returns a single idea (all columns) as a Series, or None if it doesn't exist"""
+        df = self.snapshot()
+        position = self._position(df, idea_id)
+        if position is None:
+            return None
+        return pd.concat([df.iloc[position], pd.Series(self.get_details(idea_id), dtype=object)])
+
+    def insert(self, row):
+        """
+        Adds a new idea and returns its id. row is a dict, or a function that
+        builds the dict from the new idea's id; either way a missing id is
+        handed out here, under the lock, so two sessions publishing at once
+        never get the same one. An id that's already taken raises ValueError
+        """
+        with self._lock:
+            df = self.snapshot()
+            indexes = self._view[1]
+            row = row(self.next_id()) if callable(row) else dict(row)
+            if row.get("id") is None:
+                row["id"] = self.next_id()
+            elif self._position(df, row["id"]) is not None:
+                raise ValueError(f"An idea with id {row['id']} already exists")
+            new_row = normalize_ideas(pd.DataFrame([row]).drop(columns=DETAIL_COLUMNS, errors="ignore"))
+            if not set(new_row.columns) <= set(df.columns):
+                # A brand new column - index it from scratch next time
+                indexes = {}
+            if len(df):
+                # Rows are sorted by id, newest first - slot the new one in place
+                ascending_ids = df["id"].to_numpy()[::-1]
+                position = len(df) - int(np.searchsorted(ascending_ids, row["id"], side="right"))
+                # Dictionary-encoded columns only stay encoded if both sides
+                # share the same categories
+                df = _fit_categories(df.copy(deep=False), new_row.iloc[0].to_dict())
+                for col in df.columns:
+                    if isinstance(df[col].dtype, pd.CategoricalDtype):
+                        values = new_row[col].astype(object) if col in new_row.columns else [None]
+                        new_row[col] = pd.Categorical(values, dtype=df[col].dtype)
+                df = pd.concat([df.iloc[:position], new_row, df.iloc[position:]], ignore_index=True)
+            else:
+                position, df = 0, new_row
+            self.backend.insert(row)
+            indexes = {name: index.inserted(position, row) for name, index in indexes.items()}
+            self._replace(df, indexes)
+            self._reindex(row["id"], df)
+            return row["id"]
+
+    def update(self, idea_id, fields):
+        """Changes some fields of an existing idea. Returns False if it's missing"""
+        with self._lock:
+            df = self.snapshot()
+            indexes = self._view[1]
+            position = self._position(df, idea_id)
+            if position is None:
+                return False
+            old = df.iloc[position]
+            # Copy-on-write: the new snapshot shares every column with the old
+            # one except those written below
+            df = df.copy(deep=False)
+            for col, value in fields.items():
+                if col in DETAIL_COLUMNS:
+                    continue
+                if col in DATE_COLUMNS:
+                    value = pd.to_datetime(value, errors="coerce", format="ISO8601")
+                elif col not in df.columns:
+                    df[col] = None
+                    # A brand new column - index it from scratch next time
+                    indexes = {}
+                else:
+                    df = _fit_categories(df, {col: value})
+                df.iat[position, df.columns.get_loc(col)] = value
+            self.backend.update(idea_id, fields)
+            self._details.pop(idea_id, None)
+            indexes = {name: index.updated(position, fields, old) for name, index in indexes.items()}
+            self._replace(df, indexes)
+            if "Name" in fields or "Description" in fields:
+                self._reindex(idea_id, df)
+            return True
+
+    def delete(self, idea_id):
+        """Removes an idea. Returns False if it's missing"""
+        with self._lock:
+            df = self.snapshot()
+            indexes = self._view[1]
+            position = self._position(df, idea_id)
+            if position is None:
+                return False
+            old = df.iloc[position]
+            df = df.drop(index=df.index[position]).reset_index(drop=True)
+            self.backend.delete(idea_id)
+            self._details.pop(idea_id, None)
+            indexes = {name: index.deleted(position, old) for name, index in indexes.items()}
+            self._replace(df, indexes)
+            self._reindex(idea_id, df)
+            return True
+
+
+@process_wide
+def get_store():
+    """Returns the process-wide idea store, creating it on first use"""
+    return IdeaStore()
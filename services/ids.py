@@ -0,0 +1,117 @@
+import numpy as np
+
+# Ids above this many slots per row (plus some slack) go to a plain dict
+# instead of stretching the dense array
+_DENSE_SLOTS_PER_ROW = 8
+_DENSE_SLACK = 1024
+
+
+class IdIndex:
+    """
+    Primary-key index for one ideas snapshot: id -> row position.
+
+    Ids are handed out one by one by IdeaStore.next_id(), so they're small
+    non-negative integers and a dense array indexed by id does the lookup in
+    O(1). The odd id far outside that range lives in a small dict instead.
+
+    The array stores positions counted from the end of the frame. Snapshots
+    are sorted newest id first, so the usual insert (a brand new id at row 0)
+    doesn't move anyone else's slot.
+
+    Like the other snapshot indexes it's immutable - inserted(), updated()
+    and deleted() return the index for the next snapshot.
+    """
+
+    def __init__(self, df=None):
+        self.size = 0 if df is None else len(df)
+        ids = np.empty(0, dtype=np.int64) if df is None else df["id"].to_numpy(dtype=np.int64)
+        from_end = np.arange(self.size - 1, -1, -1, dtype=np.int64)
+        limit = self.size * _DENSE_SLOTS_PER_ROW + _DENSE_SLACK
+        dense = (ids >= 0) & (ids < limit)
+        self._slots = np.full(int(ids[dense].max()) + 1 if dense.any() else 0, -1, dtype=np.int64)
+        self._slots[ids[dense]] = from_end[dense]
+        self._sparse = dict(zip(ids[~dense].tolist(), from_end[~dense].tolist()))
+
+    def position(self, idea_id):
+        """Row position of idea_id in the snapshot, or None"""
+        try:
+            idea_id = int(idea_id)
+        except (TypeError, ValueError):
+            return None
+        if 0 <= idea_id < len(self._slots):
+            from_end = int(self._slots[idea_id])
+        else:
+            from_end = self._sparse.get(idea_id, -1)
+        if from_end < 0 or from_end >= self.size:
+            return None
+        return self.size - 1 - from_end
+
+    def positions(self, ids):
+        """Row positions of the ids that are in the snapshot (others are left out)"""
+        ids = np.asarray(ids, dtype=np.int64).ravel()
+        from_end = np.full(len(ids), -1, dtype=np.int64)
+        dense = (ids >= 0) & (ids < len(self._slots))
+        from_end[dense] = self._slots[ids[dense]]
+        if self._sparse:
+            for i in np.flatnonzero(~dense):
+                from_end[i] = self._sparse.get(int(ids[i]), -1)
+        from_end = from_end[(from_end >= 0) & (from_end < self.size)]
+        return self.size - 1 - from_end
+
+    def _derive(self, size):
+        index = IdIndex.__new__(IdIndex)
+        index.size = size
+        index._slots = self._slots
+        index._sparse = self._sparse
+        return index
+
+    def _shift(self, index, below, step):
+        """Adds step to every slot whose position-from-end is >= below"""
+        if below >= self.size:
+            return
+        slots = self._slots.copy()
+        slots[slots >= below] += step
+        index._slots = slots
+        index._sparse = {i: v + step if v >= below else v for i, v in self._sparse.items()}
+
+    def _set(self, index, idea_id, from_end):
+        if 0 <= idea_id < len(index._slots):
+            if index._slots is self._slots:
+                index._slots = self._slots.copy()
+            index._slots[idea_id] = from_end
+        elif 0 <= idea_id < index.size * _DENSE_SLOTS_PER_ROW + _DENSE_SLACK:
+            # Grow with room to spare so a run of inserts doesn't copy every time
+            slots = np.full(max(idea_id + 1, 2 * len(index._slots)), -1, dtype=np.int64)
+            slots[: len(index._slots)] = index._slots
+            slots[idea_id] = from_end
+            index._slots = slots
+        else:
+            if index._sparse is self._sparse:
+                index._sparse = dict(self._sparse)
+            if from_end < 0:
+                index._sparse.pop(idea_id, None)
+            else:
+                index._sparse[idea_id] = from_end
+
+    def inserted(self, position, row):
+        """Index for the snapshot with `row` inserted at `position`"""
+        index = self._derive(self.size + 1)
+        from_end = self.size - position
+        # Rows above the new one are now one further from the end
+        self._shift(index, from_end, 1)
+        self._set(index, int(row["id"]), from_end)
+        return index
+
+    def deleted(self, position, old):
+        """Index for the snapshot with the row `old` at `position` removed"""
+        index = self._derive(self.size - 1)
+        from_end = self.size - 1 - position
+        idea_id = int(old["id"])
+        # Rows above the removed one are now one closer to the end
+        self._shift(index, from_end + 1, -1)
+        self._set(index, idea_id, -1)
+        return index
+
+    def updated(self, position, fields, old=None):
+        """Ids never change, so the index carries over as it is"""
+        return self
@@ -0,0 +1,20 @@
+"""
+One-shot copy of the ideas from the CSV into the SQLite database:
+
+    python -m services.migrate
+
+Both paths follow IDEAS_CSV_PATH / IDEAS_DB_PATH, see services/storage.py.
+"""
+from .storage import CsvBackend, SqliteBackend, csv_path, db_path
+
+
+def migrate_csv_to_sqlite(csv_file=None, db_file=None):
+    """Copies every idea from the CSV file into the SQLite database"""
+    backend = SqliteBackend(db_file or db_path())
+    backend.save_all(CsvBackend(csv_file or csv_path()).load())
+    return backend
+
+
+if __name__ == "__main__":
+    migrate_csv_to_sqlite()
+    print(f"✅ Migrated {csv_path()} to {db_path()}")
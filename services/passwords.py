@@ -0,0 +1,129 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .singleton import process_wide
+
+# PBKDF2-SHA256 rounds for new hashes - the cost of one sign-in. Existing
+# hashes keep working after a change and are re-hashed on their next sign-in
+PASSWORD_HASH_ITERATIONS = int(os.environ.get("PASSWORD_HASH_ITERATIONS", "600000"))
+# Threads that run the key derivation, and how many sign-ins may wait for one
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", "32"))
+
+ALGORITHM = "pbkdf2_sha256"
+SALT_BYTES = 16
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _derive(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+
+def hash_password(password, iterations=None):
+    """Salted hash of password, stored as pbkdf2_sha256$<iterations>$<salt>$<hash>"""
+    iterations = iterations or PASSWORD_HASH_ITERATIONS
+    salt = secrets.token_bytes(SALT_BYTES)
+    return f"{ALGORITHM}${iterations}${_b64(salt)}${_b64(_derive(password, salt, iterations))}"
+
+
+def _parse(stored):
+    """(iterations, salt, hash) of a stored hash, or None for a plain-text password"""
+    parts = stored.split("$")
+    if len(parts) != 4 or parts[0] != ALGORITHM:
+        return None
+    try:
+        return int(parts[1]), base64.b64decode(parts[2]), base64.b64decode(parts[3])
+    except ValueError:
+        return None
+
+
+def check_password(password, stored):
+    """True if password matches the stored hash (or, for rows not migrated yet, the plain text)"""
+    parsed = _parse(stored)
+    if parsed is None:
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    iterations, salt, expected = parsed
+    return hmac.compare_digest(_derive(password, salt, iterations), expected)
+
+
+def needs_rehash(stored, iterations=None):
+    """True for plain-text passwords and hashes made with another cost"""
+    parsed = _parse(stored)
+    return parsed is None or parsed[0] != (iterations or PASSWORD_HASH_ITERATIONS)
+
+
+class PasswordVerifier:
+    """
+    Bounds how many password checks run at once.
+
+    verify() still blocks the calling script until its check is done; what
+    the pool limits is concurrency: at most `workers` key derivations
+    compete for the CPU however many users sign in at once (hashlib releases
+    the GIL meanwhile, so other sessions' scripts keep running). Another
+    `queue` sign-ins may wait for a free worker; beyond that verify() turns
+    them away right away (None) instead of letting the backlog grow.
+    """
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, queue=PASSWORD_HASH_QUEUE):
+        self.workers = max(workers, 1)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-verifier")
+        self._slots = threading.BoundedSemaphore(self.workers + max(queue, 0))
+        self._lock = threading.Lock()
+        self.verified = 0
+        self.rejected = 0
+        self.busy = 0
+
+    def _submit(self, fn, *args):
+        """Runs fn on the pool, or returns None if every slot is taken"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.busy += 1
+            return None
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def verify(self, password, stored):
+        """True / False once a worker has checked password (blocks until then), None if they're all busy"""
+        future = self._submit(check_password, password, stored)
+        if future is None:
+            return None
+        ok = future.result()
+        with self._lock:
+            if ok:
+                self.verified += 1
+            else:
+                self.rejected += 1
+        return ok
+
+    def rehash(self, password, done):
+        """Hashes password with the current cost in the background and passes the hash to done()"""
+        return self._submit(lambda: done(hash_password(password)))
+
+    def metrics(self):
+        """Checks that passed, failed and were turned away because the pool was full"""
+        with self._lock:
+            return {
+                "verified": self.verified,
+                "rejected": self.rejected,
+                "busy": self.busy,
+                "workers": self.workers,
+            }
+
+
+@process_wide
+def get_password_verifier():
+    """Returns the process-wide password verifier"""
+    return PasswordVerifier()
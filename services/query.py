@@ -0,0 +1,199 @@
+"""
+Declarative queries over the ideas table.
+
+A Query says what the caller wants - equality / range / text predicates, an
+id list, the columns, a sort and a page - and run_query() works out how to answer
+it from one ideas snapshot and its indexes:
+
+- equality predicates on bitmap columns are ANDs of cached bitmaps
+- date ranges are binary searches in the DateIndex
+- id lists and search matches are mapped to rows through the IdIndex
+- the text search, the most expensive step, runs last and is skipped once
+  the other predicates have ruled out every row
+- only the rows of the requested page are copied out of the snapshot
+
+Anything an index doesn't cover falls back to a comparison over the column.
+IdeaStore.query() is the entry point.
+"""
+import numpy as np
+import pandas as pd
+
+from .dates import to_ns
+
+
+def _unset(value):
+    return value is None or (isinstance(value, str) and value == "")
+
+
+def _normalized(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted((_normalized(v) for v in value), key=repr))
+    if hasattr(value, "isoformat") or isinstance(value, np.datetime64):
+        return to_ns(value)
+    return value
+
+
+class Query:
+    """
+    What to read from the ideas table.
+
+    where    {column: value or list of values} - column equals (any of) them
+    ranges   {column: (start, end)} - start <= column <= end, either bound may be None
+    search   text that Name or Description has to contain (case-insensitive)
+    ids      only these idea ids (an empty list matches nothing)
+    columns  the columns to return, all of them if None
+    sort     [(column, ascending)], applied after the default newest-id-first order
+    offset, limit  the slice of sorted rows to return (limit None = all)
+
+    Unset predicates (None or "") are dropped, so filter bars can pass their
+    widget values straight in.
+    """
+
+    def __init__(self, where=None, ranges=None, search=None, ids=None,
+                 columns=None, sort=None, offset=0, limit=None):
+        self.where = {c: v for c, v in (where or {}).items() if not _unset(v)}
+        self.ranges = {
+            c: (start, end) for c, (start, end) in (ranges or {}).items()
+            if not (_unset(start) and _unset(end))
+        }
+        self.search = search or None
+        self.ids = None if ids is None else list(ids)
+        self.columns = None if columns is None else list(columns)
+        self.sort = [(column, bool(ascending)) for column, ascending in (sort or [])]
+        self.offset = max(int(offset or 0), 0)
+        self.limit = limit
+
+    def replace(self, **changes):
+        """A copy of the query with some arguments changed"""
+        args = dict(where=self.where, ranges=self.ranges, search=self.search, ids=self.ids,
+                    columns=self.columns, sort=self.sort, offset=self.offset, limit=self.limit)
+        args.update(changes)
+        return Query(**args)
+
+    def key(self):
+        """Hashable form of the predicates - equal for queries that match the same rows"""
+        return (
+            tuple(sorted((c, _normalized(v)) for c, v in self.where.items())),
+            tuple(sorted((c, to_ns(s), to_ns(e)) for c, (s, e) in self.ranges.items())),
+            # The search is case-insensitive
+            None if self.search is None else self.search.lower(),
+            None if self.ids is None else tuple(sorted(set(self.ids))),
+        )
+
+
+class QueryResult:
+    """
+    The answer to a Query.
+
+    total      number of matching rows, before offset / limit
+    positions  row positions of the matching rows in the snapshot, sorted
+    rows       the requested page of rows and columns, copied out on first use
+    """
+
+    def __init__(self, df, positions, query=None, rows=None):
+        self.df = df
+        self.positions = positions
+        self.query = query or Query()
+        self.total = len(positions)
+        self._rows = rows
+
+    @property
+    def page(self):
+        """Row positions of the requested page"""
+        stop = None if self.query.limit is None else self.query.offset + self.query.limit
+        return self.positions[self.query.offset:stop]
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            rows = self.df.iloc[self.page]
+            if self.query.columns is not None:
+                rows = rows[[c for c in self.query.columns if c in rows.columns]]
+            self._rows = rows.reset_index(drop=True)
+        return self._rows
+
+    @property
+    def ids(self):
+        """Ids of all matching rows, in order"""
+        return self.df["id"].to_numpy()[self.positions]
+
+
+def _scan(df, column, wanted):
+    """Rows where column == wanted (or is in wanted) without an index"""
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    if isinstance(wanted, (list, tuple, set)):
+        return df[column].isin(list(wanted)).to_numpy()
+    return (df[column] == wanted).to_numpy()
+
+
+def _scan_range(df, column, start, end):
+    """Rows where start <= column <= end without an index"""
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    stamps = pd.to_datetime(df[column], errors="coerce").to_numpy(dtype="datetime64[ns]")
+    values = stamps.astype(np.int64)
+    result = ~np.isnat(stamps)
+    if to_ns(start) is not None:
+        result &= values >= to_ns(start)
+    if to_ns(end) is not None:
+        result &= values <= to_ns(end)
+    return result
+
+
+def match(store, df, query, cancelled=None):
+    """
+    Boolean row mask of df for the query's predicates, or None if the
+    search was cancelled
+    """
+    bitmaps = store.bitmaps(df)
+    dates = store.dates(df)
+    mask = bitmaps.mask({c: v for c, v in query.where.items() if c in bitmaps.columns})
+    for column, wanted in query.where.items():
+        if column not in bitmaps.columns:
+            mask &= _scan(df, column, wanted)
+    for column, (start, end) in query.ranges.items():
+        if column in dates.columns:
+            mask &= dates.mask(column, start=start, end=end)
+        else:
+            mask &= _scan_range(df, column, start, end)
+    if query.ids is not None:
+        mask &= _id_mask(store, df, query.ids)
+    if query.search and mask.any():
+        # Trigram index lookup instead of scanning Name / Description
+        ids = store.search_ids(query.search, cancelled)
+        if ids is None:
+            return None
+        mask &= _id_mask(store, df, ids)
+    return mask
+
+
+def _id_mask(store, df, ids):
+    result = np.zeros(len(df), dtype=bool)
+    result[store.ids(df).positions(ids)] = True
+    return result
+
+
+def sort_positions(df, positions, sort):
+    """Reorders row positions of df by [(column, ascending)], missing values last"""
+    positions = np.asarray(positions)
+    # Stable sorts, last key first, give a multi-column sort
+    for column, ascending in reversed(sort):
+        if column not in df.columns or len(positions) == 0:
+            continue
+        values = df[column].iloc[positions].reset_index(drop=True)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Sort by the values themselves, not the order categories were added in
+            values = values.astype(values.cat.categories.dtype)
+        order = values.sort_values(ascending=ascending, kind="stable", na_position="last").index
+        positions = positions[order.to_numpy()]
+    return positions
+
+
+def run_query(store, df, query, cancelled=None):
+    """Answers query from snapshot df and its indexes. None if cancelled"""
+    mask = match(store, df, query, cancelled)
+    if mask is None:
+        return None
+    positions = sort_positions(df, np.flatnonzero(mask), query.sort)
+    return QueryResult(df, positions, query)
@@ -0,0 +1,166 @@
+import atexit
+import csv
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from .singleton import process_wide
+
+LOGIN_ATTEMPTS_CSV = "data/login_attempts.csv"
+
+# Failed logins allowed per username within the window before it is locked out
+LOGIN_MAX_ATTEMPTS = int(os.environ.get("LOGIN_MAX_ATTEMPTS", "5"))
+LOGIN_WINDOW_SECONDS = float(os.environ.get("LOGIN_WINDOW_SECONDS", str(15 * 60)))
+# How long changes wait in memory before they are written out together (0 = every change)
+LOGIN_FLUSH_SECONDS = float(os.environ.get("LOGIN_ATTEMPTS_FLUSH_SECONDS", "5"))
+
+
+class LoginRateLimiter:
+    """
+    Sliding-window limit on failed logins, per username, shared by all sessions.
+
+    The timestamps of each username's most recent failures are kept in memory
+    (at most max_attempts of them - older ones can't change the answer), so
+    checking and recording an attempt never touches the disk. Usernames whose
+    failures have all left the window are dropped.
+
+    Changes are written behind: the first one after a flush schedules the next
+    flush `flush_seconds` later, and that flush writes the whole (already
+    expired) table to `path` in one go. The file is read back on start-up, so
+    lockouts survive a restart, minus at most the last flush interval.
+    """
+
+    def __init__(self, path=LOGIN_ATTEMPTS_CSV, max_attempts=LOGIN_MAX_ATTEMPTS,
+                 window=LOGIN_WINDOW_SECONDS, flush_seconds=LOGIN_FLUSH_SECONDS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.window = window
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._attempts = {}
+        self._dirty = False
+        self._timer = None
+        self.failures = 0
+        self.blocked = 0
+        self.flushes = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                rows = [
+                    (row["username"], datetime.fromisoformat(row["timestamp"]).timestamp())
+                    for row in csv.DictReader(f)
+                ]
+        except (OSError, KeyError, TypeError, ValueError):
+            # Unreadable file - start over rather than lock everybody out
+            return
+        for username, stamp in sorted(rows, key=lambda row: row[1]):
+            self._recent(username).append(stamp)
+        self._expire(time.time())
+
+    def _recent(self, username):
+        recent = self._attempts.get(username)
+        if recent is None:
+            recent = self._attempts[username] = deque(maxlen=self.max_attempts)
+        return recent
+
+    def _expire(self, now, username=None):
+        """Drops failures older than the window - for one username or all of them"""
+        usernames = list(self._attempts) if username is None else [username]
+        for name in usernames:
+            recent = self._attempts.get(name)
+            if recent is None:
+                continue
+            while recent and now - recent[0] >= self.window:
+                recent.popleft()
+            if not recent:
+                del self._attempts[name]
+
+    def is_limited(self, username):
+        """True if username has used up its failed attempts for now"""
+        with self._lock:
+            self._expire(time.time(), username)
+            limited = len(self._attempts.get(username, ())) >= self.max_attempts
+            if limited:
+                self.blocked += 1
+            return limited
+
+    def add_failure(self, username):
+        """Records a failed login for username"""
+        with self._lock:
+            self._recent(username).append(time.time())
+            self.failures += 1
+            self._changed()
+
+    def clear(self, username):
+        """Forgets username's failed attempts, e.g. after a successful login"""
+        with self._lock:
+            if self._attempts.pop(username, None) is not None:
+                self._changed()
+
+    def _changed(self):
+        self._dirty = True
+        if self.flush_seconds <= 0:
+            # Nothing to batch - write now, outside the lock
+            threading.Thread(target=self.flush, daemon=True).start()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_seconds, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Writes the current failures to disk if anything changed since the last flush"""
+        with self._write_lock:
+            with self._lock:
+                self._timer = None
+                if not self._dirty:
+                    return
+                self._expire(time.time())
+                rows = sorted(
+                    (stamp, username)
+                    for username, recent in self._attempts.items() for stamp in recent
+                )
+                self._dirty = False
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f, lineterminator="\n")
+                    writer.writerow(["username", "timestamp"])
+                    for stamp, username in rows:
+                        writer.writerow([username, datetime.fromtimestamp(stamp).isoformat(sep=" ")])
+                os.replace(tmp_path, self.path)
+            except OSError:
+                # Try again with the next change (or at exit)
+                with self._lock:
+                    self._dirty = True
+                raise
+            self.flushes += 1
+
+    def metrics(self):
+        """Failures recorded, logins refused and flushes written so far"""
+        with self._lock:
+            return {
+                "failures": self.failures,
+                "blocked": self.blocked,
+                "flushes": self.flushes,
+                "usernames": len(self._attempts),
+                "pending": self._dirty,
+            }
+
+
+@process_wide
+def get_login_limiter():
+    """Returns the process-wide login rate limiter"""
+    limiter = LoginRateLimiter()
+    # Don't lose the last few seconds of failures on a clean shutdown
+    atexit.register(limiter.flush)
+    return limiter
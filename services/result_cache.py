@@ -0,0 +1,117 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .singleton import process_wide
+
+# Memory the cached results may take up in total, and how long one is kept
+RESULT_CACHE_MB = float(os.environ.get("IDEAS_RESULT_CACHE_MB", "64"))
+RESULT_CACHE_TTL = float(os.environ.get("IDEAS_RESULT_CACHE_TTL", "300"))
+
+
+def _nbytes(value):
+    """Rough memory footprint of a cached value"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_nbytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    LRU cache of query results shared by all sessions.
+
+    Entries belong to one version of the ideas snapshot (IdeaStore.version_of).
+    The first lookup or store for a newer version drops everything cached for
+    older ones, so a write never has to know what was cached. Lookups made
+    against a snapshot that is no longer current (version None) bypass the
+    cache.
+
+    Entries expire `ttl` seconds after they were stored, and the least
+    recently used ones are evicted once the cached values add up to more
+    than `max_bytes`.
+    """
+
+    def __init__(self, max_bytes=int(RESULT_CACHE_MB * 1024 * 1024), ttl=RESULT_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version = None
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _check_version(self, version):
+        """Drops the entries of older versions. False if version itself is stale"""
+        if version is None or (self.version is not None and version < self.version):
+            return False
+        if version != self.version:
+            self._entries.clear()
+            self.nbytes = 0
+            self.version = version
+        return True
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.nbytes -= size
+
+    def get(self, version, key):
+        """The value stored for key at this snapshot version, or None"""
+        with self._lock:
+            if not self._check_version(version) or key not in self._entries:
+                self.misses += 1
+                return None
+            value, _, stored = self._entries[key]
+            if time.monotonic() - stored > self.ttl:
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, version, key, value):
+        """Stores value for key at this snapshot version"""
+        size = _nbytes(value)
+        with self._lock:
+            if not self._check_version(version) or size > self.max_bytes:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, time.monotonic())
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def metrics(self):
+        """Hit / miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "version": self.version,
+            }
+
+
+@process_wide
+def get_result_cache():
+    """Returns the process-wide query result cache"""
+    return ResultCache()
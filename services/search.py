@@ -0,0 +1,194 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Fold the delta back into the main index once it has this many entries
+# (or 10% of the indexed ideas, whichever is larger)
+REBUILD_MIN_CHANGES = 1000
+
+# Query text never contains this, so it safely separates Name and Description
+_FIELD_SEP = "\n"
+
+# Candidates are checked in chunks of this size, asking `cancelled` in between
+VERIFY_CHUNK = 50_000
+
+_MASK31 = np.uint64(0x7FFFFFFF)
+_PRIME = np.uint64(1_000_003)
+
+
+def _doc_text(name, description):
+    name = "" if pd.isna(name) else str(name)
+    description = "" if pd.isna(description) else str(description)
+    return f"{name}{_FIELD_SEP}{description}".lower()
+
+
+def _gram_codes(chars):
+    """Hashes every 3-character window of a code point array into 31 bits"""
+    c = chars.astype(np.uint64)
+    return (((c[:-2] * _PRIME + c[1:-1]) * _PRIME + c[2:]) & _MASK31).astype(np.int64)
+
+
+def _query_codes(query):
+    chars = np.frombuffer(query.encode("utf-32-le"), dtype=np.uint32)
+    return set(_gram_codes(chars).tolist())
+
+
+class SearchIndex:
+    """
+    Trigram index for the "Search (name / description)" boxes.
+
+    Matches the same ideas as `Name.str.lower().str.contains(q) |
+    Description.str.lower().str.contains(q)` with q taken literally, but
+    instead of scanning every row it intersects the posting lists of the
+    query's trigrams and only checks the few candidates that are left.
+
+    The bulk of the index is a set of sorted NumPy arrays (CSR layout) built
+    in one vectorized pass. Changes after that go into a small delta plus a
+    set of removed ids, and everything is rebuilt once the delta grows.
+    Trigrams are hashed to 31 bits; a collision only adds a candidate that
+    the final substring check throws away.
+    """
+
+    def __init__(self, df=None):
+        self._lock = threading.RLock()
+        self._build({} if df is None else self._texts_from_frame(df))
+
+    @staticmethod
+    def _texts_from_frame(df):
+        names = df["Name"] if "Name" in df.columns else pd.Series("", index=df.index)
+        descriptions = df["Description"] if "Description" in df.columns else pd.Series("", index=df.index)
+        # Plain values first: fillna("") can't add "" to a categorical's categories
+        texts = (
+            names.astype(object).fillna("").astype(str) + _FIELD_SEP
+            + descriptions.astype(object).fillna("").astype(str)
+        ).str.lower()
+        return dict(zip(df["id"].astype("int64").tolist(), texts.tolist()))
+
+    def _build(self, texts):
+        ids = np.fromiter(texts.keys(), dtype=np.int64, count=len(texts))
+        docs = list(texts.values())
+
+        self._ids = ids
+        # Arrow-backed strings where available: one buffer instead of a
+        # Python object per idea
+        self._texts = pd.Series(docs, dtype="str")
+        self._position = {idea_id: i for i, idea_id in enumerate(ids.tolist())}
+        self._removed = np.zeros(len(ids), dtype=bool)
+        self._removed_count = 0
+        self._delta = {}
+
+        if not docs:
+            self._keys = np.empty(0, dtype=np.int64)
+            self._offsets = np.zeros(1, dtype=np.int64)
+            self._postings = np.empty(0, dtype=np.int32)
+            return
+
+        # One long code point array with a NUL between documents
+        chars = np.frombuffer("\0".join(docs).encode("utf-32-le"), dtype=np.uint32)
+        lengths = np.fromiter((len(d) + 1 for d in docs), dtype=np.int64, count=len(docs))
+        doc_of = np.repeat(np.arange(len(docs), dtype=np.int64), lengths)[: len(chars)]
+
+        codes = _gram_codes(chars)
+        sep = np.uint32(ord(_FIELD_SEP))
+        window_ok = np.ones(len(codes), dtype=bool)
+        for shift in range(3):
+            window = chars[shift: len(chars) - 2 + shift]
+            window_ok &= (window != 0) & (window != sep)
+
+        # Unique (trigram, document) pairs, sorted by trigram then document
+        pairs = (codes[window_ok] << 32) | doc_of[:-2][window_ok]
+        pairs.sort()
+        pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+        gram_of_pair = pairs >> 32
+        starts = np.flatnonzero(np.concatenate(([True], gram_of_pair[1:] != gram_of_pair[:-1])))
+        self._keys = gram_of_pair[starts]
+        self._postings = (pairs & 0xFFFFFFFF).astype(np.int32)
+        self._offsets = np.append(starts, len(pairs)).astype(np.int64)
+
+    def _postings_for(self, code):
+        i = np.searchsorted(self._keys, code)
+        if i == len(self._keys) or self._keys[i] != code:
+            return None
+        return self._postings[self._offsets[i]: self._offsets[i + 1]]
+
+    def _base_matches(self, query, cancelled=None):
+        if len(query) < 3:
+            # Too short for trigrams - plain scan of the lowered text
+            candidates = np.arange(len(self._ids))
+        else:
+            lists = []
+            for code in _query_codes(query):
+                postings = self._postings_for(code)
+                if postings is None:
+                    return np.empty(0, dtype=np.int64)
+                lists.append(postings)
+            lists.sort(key=len)
+            candidates = lists[0]
+            for postings in lists[1:]:
+                if cancelled is not None and cancelled():
+                    return None
+                candidates = np.intersect1d(candidates, postings, assume_unique=True)
+                if len(candidates) == 0:
+                    return np.empty(0, dtype=np.int64)
+
+        candidates = candidates[~self._removed[candidates]]
+        found = []
+        for start in range(0, len(candidates), VERIFY_CHUNK):
+            if cancelled is not None and cancelled():
+                return None
+            chunk = candidates[start:start + VERIFY_CHUNK]
+            hits = self._texts.iloc[chunk].str.contains(query, regex=False).to_numpy(dtype=bool)
+            found.append(self._ids[chunk[hits]])
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def search(self, query, cancelled=None):
+        """
+        Returns the ids (NumPy array) of ideas whose Name or Description
+        contains query. cancelled() is polled between steps; if it returns
+        True the search stops and returns None.
+        """
+        query = (query or "").lower()
+        if _FIELD_SEP in query:
+            return np.empty(0, dtype=np.int64)
+        with self._lock:
+            base = self._base_matches(query, cancelled)
+            if base is None:
+                return None
+            extra = [i for i, text in self._delta.items() if query in text]
+        if extra:
+            return np.concatenate([base, np.array(extra, dtype=np.int64)])
+        return base
+
+    def _maybe_rebuild(self):
+        changes = len(self._delta) + self._removed_count
+        if changes > max(REBUILD_MIN_CHANGES, len(self._ids) // 10):
+            texts = {
+                idea_id: text
+                for idea_id, text, removed in zip(self._ids.tolist(), self._texts.tolist(), self._removed)
+                if not removed
+            }
+            texts.update(self._delta)
+            self._build(texts)
+
+    def _drop_from_base(self, idea_id):
+        position = self._position.get(idea_id)
+        if position is not None and not self._removed[position]:
+            self._removed[position] = True
+            self._removed_count += 1
+
+    def remove(self, idea_id):
+        """Forgets an idea"""
+        idea_id = int(idea_id)
+        with self._lock:
+            self._delta.pop(idea_id, None)
+            self._drop_from_base(idea_id)
+            self._maybe_rebuild()
+
+    def add(self, idea_id, name, description):
+        """Indexes a new idea, or re-indexes one whose Name / Description changed"""
+        idea_id = int(idea_id)
+        with self._lock:
+            self._drop_from_base(idea_id)
+            self._delta[idea_id] = _doc_text(name, description)
+            self._maybe_rebuild()
@@ -0,0 +1,22 @@
+import functools
+import threading
+
+
+def process_wide(factory):
+    """
+    Decorator for the get_* functions that hand out a process-wide object:
+    factory() runs once, on first use, and every later call - from any
+    session's thread - returns the same object
+    """
+    instance = []
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def get():
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    return get
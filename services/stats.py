@@ -0,0 +1,173 @@
+import bisect
+from collections import Counter
+
+import pandas as pd
+
+from .dates import to_ns
+
+# The overview counts are kept per combination of these columns
+STATS_COLUMNS = ["Status", "Category", "Visibility Setting"]
+
+# Per (Status, Visibility) group, how many of the most recently published
+# ideas we remember - deletes eat into this before a rebuild is needed
+RECENT_KEEP = 50
+
+
+def _value(row, column):
+    value = row.get(column) if hasattr(row, "get") else None
+    return None if value is None or pd.isna(value) else value
+
+
+class IdeaStats:
+    """
+    Materialized overview numbers for one ideas snapshot.
+
+    `counts` holds the number of ideas for every (Status, Category,
+    Visibility Setting) combination, so totals, per-category breakdowns and
+    the Category x Status table for any role's view are sums over a few
+    dozen cells. `recent` holds, per (Status, Visibility) group, the
+    RECENT_KEEP newest ideas by Date published as an ascending list of
+    (date, id) pairs.
+
+    inserted(), updated() and deleted() touch only the cells and lists the
+    row belongs to. If deletes leave a recent list shorter than a caller
+    asks for, recent_ids() returns None and the store rebuilds the stats
+    from its snapshot.
+    """
+
+    def __init__(self, df=None):
+        self.counts = Counter()
+        self.recent = {}
+        self._dated = Counter()
+        if df is None or len(df) == 0:
+            return
+        keys = pd.DataFrame({
+            column: df[column] if column in df.columns else None for column in STATS_COLUMNS
+        }).astype(object).where(lambda frame: frame.notna(), None)
+        self.counts = Counter(map(tuple, keys.itertuples(index=False, name=None)))
+
+        if "Date published" not in df.columns:
+            return
+        dated = pd.DataFrame({
+            "group": list(zip(keys["Status"], keys["Visibility Setting"])),
+            "date": df["Date published"].to_numpy(dtype="datetime64[ns]").astype("int64"),
+            "id": df["id"].astype("int64"),
+        })[df["Date published"].notna().to_numpy()]
+        self._dated = Counter(dated["group"].tolist())
+        newest = dated.sort_values(["date", "id"]).groupby("group", sort=False).tail(RECENT_KEEP)
+        for group, rows in newest.groupby("group", sort=False):
+            self.recent[group] = list(zip(rows["date"].tolist(), rows["id"].tolist()))
+
+    @staticmethod
+    def _key(row):
+        return tuple(_value(row, column) for column in STATS_COLUMNS)
+
+    @staticmethod
+    def _matches(key, filters):
+        for column, wanted in (filters or {}).items():
+            value = key[STATS_COLUMNS.index(column)]
+            if isinstance(wanted, (list, tuple, set)) and value not in wanted:
+                return False
+            if not isinstance(wanted, (list, tuple, set)) and value != wanted:
+                return False
+        return True
+
+    def total(self, filters=None):
+        """Number of ideas matching filters ({column: value or list of values})"""
+        return sum(n for key, n in self.counts.items() if self._matches(key, filters))
+
+    def by(self, column, filters=None):
+        """{value: number of ideas} for column, largest first, missing values left out"""
+        i = STATS_COLUMNS.index(column)
+        totals = Counter()
+        for key, n in self.counts.items():
+            if key[i] is not None and self._matches(key, filters):
+                totals[key[i]] += n
+        return dict(sorted(totals.items(), key=lambda item: (-item[1], str(item[0]))))
+
+    def crosstab(self, rows="Category", columns="Status", filters=None):
+        """Same table as df.groupby([rows, columns]).size().unstack(fill_value=0)"""
+        r, c = STATS_COLUMNS.index(rows), STATS_COLUMNS.index(columns)
+        cells = Counter()
+        for key, n in self.counts.items():
+            if key[r] is not None and key[c] is not None and self._matches(key, filters):
+                cells[(key[r], key[c])] += n
+        if not cells:
+            return pd.DataFrame()
+        table = pd.Series(cells).rename_axis([rows, columns]).unstack(fill_value=0)
+        return table.sort_index().sort_index(axis=1)
+
+    def recent_ids(self, n, filters=None):
+        """
+        Ids of the n most recently published ideas matching filters on
+        Status / Visibility Setting (ties go to the higher id), or None if
+        the remembered lists have run too short to tell.
+        """
+        merged = []
+        for (status, visibility), entries in self.recent.items():
+            if not self._matches((status, None, visibility), filters):
+                continue
+            if len(entries) < min(n, self._dated[(status, visibility)]):
+                return None
+            merged.extend(entries[-n:])
+        merged.sort(reverse=True)
+        return [idea_id for _, idea_id in merged[:n]]
+
+    def _derive(self):
+        stats = IdeaStats.__new__(IdeaStats)
+        stats.counts = Counter(self.counts)
+        stats.recent = dict(self.recent)
+        stats._dated = Counter(self._dated)
+        return stats
+
+    def _add(self, key, row):
+        self.counts[key] += 1
+        date = to_ns(_value(row, "Date published"))
+        if date is None:
+            return
+        group = (key[0], key[2])
+        entries = list(self.recent.get(group, []))
+        entry = (date, int(row["id"]))
+        # Unless the list holds the whole group, an idea older than everything
+        # in it may still rank below ideas we no longer remember
+        if len(entries) >= self._dated[group] or (entries and entry > entries[0]):
+            bisect.insort(entries, entry)
+            self.recent[group] = entries[-RECENT_KEEP:]
+        self._dated[group] += 1
+
+    def _remove(self, key, row):
+        self.counts[key] -= 1
+        if self.counts[key] <= 0:
+            del self.counts[key]
+        date = to_ns(_value(row, "Date published"))
+        if date is None:
+            return
+        group = (key[0], key[2])
+        self._dated[group] -= 1
+        entry = (date, int(row["id"]))
+        entries = self.recent.get(group, [])
+        if entry in entries:
+            self.recent[group] = [e for e in entries if e != entry]
+
+    def inserted(self, position, row):
+        """Stats for the snapshot with `row` added"""
+        stats = self._derive()
+        stats._add(self._key(row), row)
+        return stats
+
+    def deleted(self, position, old):
+        """Stats for the snapshot with the row `old` removed"""
+        stats = self._derive()
+        stats._remove(self._key(old), old)
+        return stats
+
+    def updated(self, position, fields, old):
+        """Stats for the snapshot with some fields of the row `old` changed"""
+        if not any(column in fields for column in STATS_COLUMNS + ["Date published"]):
+            return self
+        new = dict(old.items())
+        new.update(fields)
+        stats = self._derive()
+        stats._remove(self._key(old), old)
+        stats._add(self._key(new), new)
+        return stats
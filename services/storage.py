@@ -0,0 +1,741 @@
+"""
+Storage backends for the ideas table.
+
+The idea store keeps the parsed table in memory and hands every change to a
+backend, one row at a time. Two backends are available:
+
+- CsvBackend - data/ideas.csv plus an append-only change log (small installs),
+  with a typed data/ideas.parquet copy when pyarrow is installed
+- SqliteBackend - data/ideas.db in WAL mode with indexes on the filter columns
+
+Pick one with the IDEAS_BACKEND environment variable ("csv" or "sqlite").
+The first time SQLite is used it is filled from the existing CSV.
+"""
+import csv
+import json
+import os
+import sqlite3
+import threading
+import warnings
+from datetime import date, datetime
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet snapshots and the fast CSV reader are optional
+    pa = None
+    pacsv = None
+    pq = None
+
+IDEAS_CSV = "data/ideas.csv"
+IDEAS_DB = "data/ideas.db"
+IDEAS_PARQUET = "data/ideas.parquet"
+
+DATE_COLUMNS = ["From date", "To date", "Date published"]
+
+IDEA_COLUMNS = [
+    "id", "Status", "From date", "To date", "Document name",
+    "Date published", "Issue Number", "Name", "Category",
+    "Description", "Detailed Description",
+    "Estimated Impact / Target Audience", "Owner", "Visibility Setting"
+]
+
+# Long free-text fields only the Open / Edit pages show
+DETAIL_COLUMNS = ["Detailed Description", "Estimated Impact / Target Audience"]
+
+# Everything the list pages need
+LIST_COLUMNS = [c for c in IDEA_COLUMNS if c not in DETAIL_COLUMNS]
+
+# Low-cardinality columns stored dictionary-encoded in the Parquet snapshot
+CATEGORY_COLUMNS = ["Status", "Category", "Owner", "Visibility Setting"]
+
+# The CSV mutation log is folded into a fresh snapshot past this size
+COMPACT_BYTES = int(os.environ.get("IDEAS_LOG_COMPACT_BYTES", 1_000_000))
+
+# Columns the list pages filter on, so SQLite gets an index for each
+INDEXED_COLUMNS = ["Owner", "Status", "Category", "Visibility Setting", "Date published"]
+
+
+def empty_ideas_frame():
+    """Returns an empty ideas table with the expected columns"""
+    return pd.DataFrame(columns=IDEA_COLUMNS)
+
+
+def _csv_header(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def _read_csv_arrow(path, columns):
+    """The CSV through pyarrow's multi-threaded reader, typed while it parses"""
+    types = {}
+    for column in columns:
+        if column == "id":
+            types[column] = pa.int64()
+        elif column in DATE_COLUMNS:
+            types[column] = pa.timestamp("s")
+        elif column in CATEGORY_COLUMNS:
+            types[column] = pa.dictionary(pa.int32(), pa.string())
+        else:
+            types[column] = pa.string()
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(use_threads=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types=types,
+            include_columns=columns,
+            timestamp_parsers=[pacsv.ISO8601],
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas()
+
+
+def _read_csv_pandas(path, columns):
+    """The CSV through pandas' C parser, with the same column types declared up front"""
+    dates = [c for c in columns if c in DATE_COLUMNS]
+    return pd.read_csv(
+        path,
+        usecols=columns,
+        dtype={c: "category" for c in columns if c in CATEGORY_COLUMNS},
+        parse_dates=dates,
+        date_format="ISO8601",
+    )
+
+
+def read_ideas_csv(path, columns=None):
+    """
+    Reads an ideas CSV (all columns, or just `columns`) with its schema
+    declared up front: int ids, parsed dates and dictionary-encoded
+    CATEGORY_COLUMNS come straight out of the parser instead of being
+    converted afterwards.
+
+    pyarrow's multi-threaded reader is used when it's installed. It doesn't
+    accept malformed dates, so a file it rejects - like any file without
+    pyarrow - goes through pandas' C parser instead, where a bad date
+    leaves the column as text for normalize_ideas() to coerce.
+    """
+    header = _csv_header(path)
+    columns = header if columns is None else [c for c in header if c in set(columns)]
+    if not columns:
+        return pd.DataFrame()
+    if pacsv is not None:
+        try:
+            return _read_csv_arrow(path, columns)
+        except (pa.ArrowException, ValueError):
+            pass
+    return _read_csv_pandas(path, columns)
+
+
+def _ensure_folder(path):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+
+class IdeaBackend:
+    """Interface every storage backend implements"""
+
+    name = None
+
+    def signature(self):
+        """Token that changes whenever someone else modifies the stored data"""
+        raise NotImplementedError
+
+    def load(self, columns=None):
+        """Reads the ideas table, or only `columns` of it (dates may still be strings)"""
+        raise NotImplementedError
+
+    def save_all(self, df):
+        """Replaces everything that's stored with df"""
+        raise NotImplementedError
+
+    def load_row(self, idea_id, columns):
+        """Reads `columns` of a single idea as a dict, or None if it doesn't exist"""
+        df = self.load(columns=list(dict.fromkeys(["id", *columns])))
+        rows = df[df["id"] == idea_id]
+        if len(rows) == 0:
+            return None
+        return {c: rows.iloc[0][c] for c in columns if c in rows.columns}
+
+    def insert(self, row):
+        raise NotImplementedError
+
+    def update(self, idea_id, fields):
+        raise NotImplementedError
+
+    def delete(self, idea_id):
+        raise NotImplementedError
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _to_plain_value(column, value):
+    """Turns pandas/python values into something sqlite3 / JSON can store"""
+    if value is None:
+        return None
+    if isinstance(value, float) and pd.isna(value):
+        return None
+    if value is pd.NaT:
+        return None
+    if column in DATE_COLUMNS:
+        ts = pd.to_datetime(value, errors="coerce")
+        return None if pd.isna(ts) else ts.strftime("%Y-%m-%d %H:%M:%S")
+    if column == "id":
+        return int(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        # numpy scalars
+        return value.item()
+    return value
+
+
+class MutationLog:
+    """
+    Append-only JSON-lines log of changes to the ideas table.
+
+    Each line is one record keyed by idea id:
+        {"op": "insert", "id": 7, "row": {...}}
+        {"op": "update", "id": 7, "fields": {...}}
+        {"op": "delete", "id": 7}
+
+    Replaying the records in order is idempotent (inserts are upserts,
+    updates set values, deletes ignore missing ids), so replaying a log on
+    top of a snapshot that already contains some of it gives the same result.
+
+    A new log starts with a line naming the mtime/size of the CSV snapshot(s)
+    its records apply to, like the Parquet copy does:
+        {"op": "base", "csv": [[mtime_ns, size], ...]}
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, record, base=None):
+        """Appends record - to a new log after a base line for CSV signature `base`"""
+        _ensure_folder(self.path)
+        with open(self.path, "a", encoding="utf-8") as f:
+            if base is not None and f.tell() == 0:
+                f.write(json.dumps({"op": "base", "csv": [base]}) + "\n")
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        good_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                good_bytes += len(line)
+        if good_bytes < os.path.getsize(self.path):
+            # Torn last line after a crash - everything before it is intact,
+            # cut the rest off so new records don't get glued onto it
+            os.truncate(self.path, good_bytes)
+        return [r for r in records if r["op"] != "base"]
+
+    def bases(self):
+        """Signatures of the CSVs the log applies to, or None if it doesn't say"""
+        try:
+            with open(self.path, "rb") as f:
+                first = json.loads(f.readline() or b"null")
+        except (FileNotFoundError, ValueError):
+            return None
+        if isinstance(first, dict) and first.get("op") == "base":
+            return first["csv"]
+        return None
+
+    def add_base(self, signature):
+        """Marks the log as applying to the CSV with `signature` as well"""
+        with open(self.path, "rb") as f:
+            lines = f.readlines()
+        bases = self.bases()
+        if bases is not None:
+            lines = lines[1:]
+        header = {"op": "base", "csv": (bases or []) + [signature]}
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode() + b"\n")
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+
+def replay(df, records):
+    """Applies mutation log records on top of a raw ideas table"""
+    if not records:
+        return df
+
+    # Collapse the log to one final state per id first, so the table itself
+    # is only touched once no matter how long the log is
+    state = {}
+    for record in records:
+        idea_id = int(record["id"])
+        op = record["op"]
+        if op == "insert":
+            state[idea_id] = ("row", dict(record["row"]))
+        elif op == "delete":
+            state[idea_id] = ("delete", None)
+        elif op == "update":
+            kind, values = state.get(idea_id, ("patch", {}))
+            if kind == "delete":
+                continue
+            values.update(record["fields"])
+            state[idea_id] = (kind, values)
+
+    touched = df["id"].isin(list(state)) if "id" in df.columns else pd.Series(False, index=df.index)
+    base_rows = {int(r["id"]): r for r in df[touched].to_dict("records")}
+
+    new_rows = []
+    for idea_id, (kind, values) in state.items():
+        if kind == "row":
+            new_rows.append({**values, "id": idea_id})
+        elif kind == "patch" and idea_id in base_rows:
+            new_rows.append({**base_rows[idea_id], **values})
+
+    df = df[~touched]
+    if not new_rows:
+        return df.reset_index(drop=True)
+    return pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
+
+
+class ParquetSnapshot:
+    """
+    Typed, columnar copy of the CSV snapshot.
+
+    Dates are stored as timestamps and the low-cardinality columns are
+    dictionary-encoded, so loading needs no text parsing and can read just
+    the columns a page needs. The file remembers the mtime/size of the CSV
+    it was written next to; if the CSV is edited by hand it is ignored
+    until the next snapshot.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def available():
+        return pq is not None
+
+    def _table(self, df):
+        df = df.copy()
+        for col in DATE_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors="coerce", format="ISO8601")
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    def write(self, df, tmp_path, csv_signature):
+        """Writes df to tmp_path, tagged with the signature of the matching CSV"""
+        table = self._table(df)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b"csv_signature"] = json.dumps(csv_signature).encode()
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+
+    def read(self, csv_signature, columns=None):
+        """Returns the snapshot as a DataFrame, or None if it's missing or stale"""
+        if not self.available() or not os.path.exists(self.path):
+            return None
+        try:
+            schema = pq.read_schema(self.path)
+            metadata = schema.metadata or {}
+            if json.loads(metadata.get(b"csv_signature", b"null")) != list(csv_signature or []):
+                return None
+            if columns is not None:
+                columns = [c for c in columns if c in schema.names]
+            # Dictionary-encoded columns come back as categoricals, which is
+            # how the store keeps them anyway
+            return pq.read_table(self.path, columns=columns).to_pandas()
+        except (OSError, ValueError, pa.ArrowException):
+            return None
+
+
+class CsvBackend(IdeaBackend):
+    """
+    Keeps ideas in a CSV snapshot plus an append-only mutation log.
+
+    Inserts, updates and deletes only append one line to `<csv>.log`, so a
+    write no longer costs a full rewrite of the file. Loading reads the
+    snapshot and replays the log on top. Once the log grows past
+    `compact_bytes` a background thread folds it into a fresh snapshot.
+
+    A log only counts on top of the CSV it was written against: if the CSV
+    is replaced by hand (or by generate_initial_data.py) the old log is
+    ignored, and dropped before the next change is appended.
+    """
+
+    name = "csv"
+
+    def __init__(self, csv_path=IDEAS_CSV, compact_bytes=COMPACT_BYTES):
+        self.csv_path = csv_path
+        self.compact_bytes = compact_bytes
+        self.parquet = ParquetSnapshot(os.path.splitext(csv_path)[0] + ".parquet")
+        self.log = MutationLog(csv_path + ".log")
+        # Records already folded into a snapshot that is still being written
+        self.compacting_log = MutationLog(csv_path + ".log.compacting")
+        self._lock = threading.RLock()
+        self._compactor = None
+        self._writes = 0
+        self._own_files = None
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.csv_path)
+            csv_sig = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            csv_sig = None
+        return (csv_sig, self.compacting_log.signature(), self.log.signature())
+
+    def _mark_own_write(self, changed=True):
+        # Remember what the files look like after our own writes, so that
+        # signature() only reports a change when another process touched them
+        if changed:
+            self._writes += 1
+        self._own_files = self._file_signature()
+
+    def signature(self):
+        files = self._file_signature()
+        if files == self._own_files:
+            return ("own", self._writes)
+        return files
+
+    def _csv_signature(self):
+        try:
+            stat = os.stat(self.csv_path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    @staticmethod
+    def _applies_to(log, csv_signature):
+        # Logs written before they named their CSV are taken as they are
+        bases = log.bases()
+        return bases is None or csv_signature in bases
+
+    def _read_csv(self, columns=None):
+        if not os.path.exists(self.csv_path):
+            df = empty_ideas_frame()
+            return df if columns is None else df[[c for c in columns if c in df.columns]]
+        return read_ideas_csv(self.csv_path, columns)
+
+    def _read_snapshot(self, columns=None):
+        """Reads the last CSV snapshot (without the log), via Parquet when it's fresh"""
+        csv_signature = self._csv_signature()
+        df = self.parquet.read(csv_signature, columns)
+        if df is not None:
+            return df
+        if csv_signature is None or not self.parquet.available():
+            return self._read_csv(columns)
+
+        # First load since the CSV changed - leave a typed copy for next time
+        df = self._read_csv()
+        self._write_parquet(df, csv_signature)
+        return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+    def load(self, columns=None):
+        # replay() needs the id column even if the caller doesn't
+        read_columns = None if columns is None else list(dict.fromkeys(["id", *columns]))
+        with self._lock:
+            csv_signature = self._csv_signature()
+            df = self._read_snapshot(read_columns)
+            records = [
+                record
+                for log in (self.compacting_log, self.log)
+                if self._applies_to(log, csv_signature)
+                for record in log.read()
+            ]
+        df = replay(df, records)
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return df
+
+    def _write_parquet(self, df, csv_signature, tmp_path=None):
+        final = tmp_path is None
+        tmp_path = tmp_path or f"{self.parquet.path}.{threading.get_ident()}.tmp"
+        try:
+            self.parquet.write(df, tmp_path, csv_signature)
+        except (OSError, ValueError, pa.ArrowException) as e:
+            warnings.warn(f"Couldn't write Parquet snapshot, using CSV only: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        if final:
+            os.replace(tmp_path, self.parquet.path)
+        return tmp_path
+
+    def _write_snapshot(self, df):
+        """Writes df to temporary CSV (+ Parquet) files and returns (tmp, final) pairs"""
+        _ensure_folder(self.csv_path)
+        csv_tmp = f"{self.csv_path}.{threading.get_ident()}.tmp"
+        df.to_csv(csv_tmp, index=False)
+        files = []
+        if self.parquet.available():
+            stat = os.stat(csv_tmp)
+            # os.replace keeps mtime and size, so this is the final CSV's signature
+            parquet_tmp = self._write_parquet(
+                df, [stat.st_mtime_ns, stat.st_size],
+                tmp_path=f"{self.parquet.path}.{threading.get_ident()}.tmp",
+            )
+            if parquet_tmp:
+                files.append((parquet_tmp, self.parquet.path))
+        files.append((csv_tmp, self.csv_path))
+        return files
+
+    @staticmethod
+    def _swap_in(files):
+        for tmp_path, final_path in files:
+            os.replace(tmp_path, final_path)
+
+    def save_all(self, df):
+        if self._compactor is not None:
+            self._compactor.join()
+        files = self._write_snapshot(df)
+        with self._lock:
+            self._swap_in(files)
+            for log in (self.compacting_log, self.log):
+                if os.path.exists(log.path):
+                    os.remove(log.path)
+            self._mark_own_write()
+
+    def _append(self, record):
+        with self._lock:
+            csv_signature = self._csv_signature()
+            if not self._applies_to(self.log, csv_signature):
+                warnings.warn(f"Dropping {self.log.path}, it was written against another {self.csv_path}")
+                os.remove(self.log.path)
+            self.log.append(record, base=csv_signature)
+            self._mark_own_write()
+            if self.log.size() >= self.compact_bytes:
+                self._start_compaction()
+
+    def insert(self, row):
+        row = {c: _to_plain_value(c, v) for c, v in row.items()}
+        self._append({"op": "insert", "id": row["id"], "row": row})
+
+    def update(self, idea_id, fields):
+        fields = {c: _to_plain_value(c, v) for c, v in fields.items()}
+        self._append({"op": "update", "id": int(idea_id), "fields": fields})
+
+    def delete(self, idea_id):
+        self._append({"op": "delete", "id": int(idea_id)})
+
+    def _start_compaction(self):
+        """Rotates the log and folds the rotated part into a new snapshot in the background"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        if os.path.exists(self.compacting_log.path) and not self._applies_to(
+            self.compacting_log, self._csv_signature()
+        ):
+            os.remove(self.compacting_log.path)
+        if os.path.exists(self.compacting_log.path):
+            # Left over from a compaction that never finished - keep its records
+            with open(self.log.path, encoding="utf-8") as src:
+                pending = src.read()
+            with open(self.compacting_log.path, "a", encoding="utf-8") as dst:
+                dst.write(pending)
+            os.remove(self.log.path)
+        else:
+            os.replace(self.log.path, self.compacting_log.path)
+        self._mark_own_write(changed=False)
+        self._compactor = threading.Thread(
+            target=self._compact, name="ideas-log-compactor", daemon=True
+        )
+        self._compactor.start()
+
+    def _compact(self):
+        # Only this thread replaces the CSV or touches the rotated log until it
+        # finishes (save_all waits for it), so reading them unlocked is safe
+        df = replay(self._read_snapshot(), self.compacting_log.read())
+        files = self._write_snapshot(df)
+        # os.replace keeps mtime and size, so this is the new CSV's signature
+        stat = os.stat(files[-1][0])
+        with self._lock:
+            if os.path.exists(self.log.path):
+                # Changes made meanwhile apply to the new CSV, as they did to
+                # the old one plus the rotated log
+                self.log.add_base([stat.st_mtime_ns, stat.st_size])
+            self._swap_in(files)
+            os.remove(self.compacting_log.path)
+            self._mark_own_write(changed=False)
+
+
+class SqliteBackend(IdeaBackend):
+    """
+    Keeps ideas in an SQLite database in WAL mode.
+
+    Inserts, updates and deletes touch a single row, and readers in other
+    processes aren't blocked while we write.
+
+    The table has a column for everything in IDEA_COLUMNS, but load() only
+    returns the ones the stored ideas actually have (recorded in
+    idea_columns) - the same columns the CSV they came from had.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path=IDEAS_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        _ensure_folder(db_path)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._columns = self._stored_columns()
+
+    def _create_schema(self):
+        columns = ", ".join(
+            f"{_quote(c)} INTEGER PRIMARY KEY" if c == "id" else f"{_quote(c)} TEXT"
+            for c in IDEA_COLUMNS
+        )
+        with self._lock, self._conn:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS ideas ({columns})")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS idea_columns (name TEXT PRIMARY KEY)")
+            for column in INDEXED_COLUMNS:
+                index_name = "idx_ideas_" + column.lower().replace(" ", "_")
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON ideas ({_quote(column)})"
+                )
+
+    def _stored_columns(self):
+        with self._lock:
+            names = {name for (name,) in self._conn.execute("SELECT name FROM idea_columns")}
+            if not names:
+                # Filled before the columns were recorded: the ones with any value
+                names = {
+                    c for c in IDEA_COLUMNS
+                    if self._conn.execute(
+                        f"SELECT 1 FROM ideas WHERE {_quote(c)} IS NOT NULL LIMIT 1"
+                    ).fetchone()
+                }
+        if not names:
+            return list(IDEA_COLUMNS)
+        return [c for c in IDEA_COLUMNS if c == "id" or c in names]
+
+    def _record_columns(self, columns, replace=False):
+        """Adds columns (all of them, if replace) to those load() returns"""
+        columns = [c for c in IDEA_COLUMNS if c in set(columns)]
+        if replace:
+            self._conn.execute("DELETE FROM idea_columns")
+        elif set(columns) <= set(self._columns):
+            return
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO idea_columns (name) VALUES (?)", [[c] for c in columns]
+        )
+        known = set(columns) if replace else set(self._columns) | set(columns)
+        self._columns = [c for c in IDEA_COLUMNS if c == "id" or c in known]
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ideas").fetchone()[0] == 0
+
+    def signature(self):
+        # data_version only changes when *another* connection commits
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load(self, columns=None):
+        with self._lock:
+            selected = ", ".join(
+                _quote(c) for c in (self._columns if columns is None else columns)
+                if c in self._columns
+            )
+            return pd.read_sql_query(f"SELECT {selected} FROM ideas", self._conn)
+
+    def _insert_rows(self, rows):
+        columns = ", ".join(_quote(c) for c in IDEA_COLUMNS)
+        marks = ", ".join("?" for _ in IDEA_COLUMNS)
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO ideas ({columns}) VALUES ({marks})",
+            [[_to_plain_value(c, row.get(c)) for c in IDEA_COLUMNS] for row in rows],
+        )
+
+    def save_all(self, df):
+        rows = df.to_dict("records")
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM ideas")
+            self._insert_rows(rows)
+            self._record_columns(df.columns, replace=True)
+
+    def load_row(self, idea_id, columns):
+        columns = [c for c in columns if c in IDEA_COLUMNS]
+        selected = ", ".join(_quote(c) for c in columns)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {selected} FROM ideas WHERE id = ?", [int(idea_id)]
+            ).fetchone()
+        return None if row is None else dict(zip(columns, row))
+
+    def insert(self, row):
+        with self._lock, self._conn:
+            self._insert_rows([row])
+            self._record_columns(row)
+
+    def update(self, idea_id, fields):
+        fields = {c: v for c, v in fields.items() if c in IDEA_COLUMNS and c != "id"}
+        if not fields:
+            return
+        assignments = ", ".join(f"{_quote(c)} = ?" for c in fields)
+        values = [_to_plain_value(c, v) for c, v in fields.items()]
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE ideas SET {assignments} WHERE id = ?", [*values, int(idea_id)]
+            )
+            self._record_columns(fields)
+
+    def delete(self, idea_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM ideas WHERE id = ?", [int(idea_id)])
+
+
+def csv_path():
+    """Where the CSV backend keeps the ideas: IDEAS_CSV_PATH, data/ideas.csv by default"""
+    return os.environ.get("IDEAS_CSV_PATH", IDEAS_CSV)
+
+
+def db_path():
+    """Where the SQLite backend keeps the ideas: IDEAS_DB_PATH, data/ideas.db by default"""
+    return os.environ.get("IDEAS_DB_PATH", IDEAS_DB)
+
+
+def make_backend(kind=None):
+    """Builds the backend picked by IDEAS_BACKEND (defaults to csv)"""
+    kind = (kind or os.environ.get("IDEAS_BACKEND", "csv")).strip().lower()
+    if kind == "sqlite":
+        backend = SqliteBackend(db_path())
+        if backend.is_empty() and os.path.exists(csv_path()):
+            backend.save_all(CsvBackend(csv_path()).load())
+        return backend
+    if kind == "csv":
+        return CsvBackend(csv_path())
+    raise ValueError(f"Unknown IDEAS_BACKEND '{kind}' (expected 'csv' or 'sqlite')")
+
@@ -0,0 +1,151 @@
+import csv
+import os
+import threading
+from collections import namedtuple
+
+from .passwords import get_password_verifier, hash_password, needs_rehash
+from .singleton import process_wide
+
+USERS_CSV = "data/users.csv"
+USER_COLUMNS = ["username", "password", "status", "role"]
+ROLES = ["admin", "investor", "student"]
+
+# Written when there is no users file yet (password aA1234)
+DEFAULT_USERS = [{"username": "admin", "password": "aA1234", "status": "active", "role": "admin"}]
+
+
+class User(namedtuple("User", ["username", "password", "status", "role"])):
+    """One row of the users file, with role and status already cleaned up"""
+
+    __slots__ = ()
+
+    @property
+    def active(self):
+        return self.status == "active"
+
+
+def _role(username, raw_role):
+    """admin / investor / student - files without a role column get admin for "admin" only"""
+    if raw_role is None:
+        return "admin" if username.strip().lower() == "admin" else "student"
+    role = raw_role.strip().lower()
+    return role if role in ROLES else "student"
+
+
+def _write_users(path, rows, fieldnames):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+
+
+class UserDirectory:
+    """
+    The users file as a dict keyed by username, shared by all sessions.
+
+    The file is read once and again only when its signature (mtime, size)
+    changes, so a sign-in is a dict lookup rather than a scan of the users
+    table. Passwords are read as text, never as numbers.
+
+    The password column holds salted hashes (see services.passwords). Rows
+    still holding plain text, or a hash made with an older cost, are
+    re-hashed in the background after the user's next successful sign-in.
+
+    A missing file is created with the default admin account, and a file
+    without a role column gets one (admin for "admin", student otherwise),
+    the same backfill the login page used to do on every render.
+    """
+
+    def __init__(self, path=USERS_CSV):
+        self.path = path
+        self._lock = threading.Lock()
+        self._users = None
+        self._signature = None
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            _write_users(
+                self.path,
+                [{**row, "password": hash_password(row["password"])} for row in DEFAULT_USERS],
+                USER_COLUMNS,
+            )
+        with open(self.path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            fieldnames = list(reader.fieldnames or [])
+            rows = list(reader)
+        if "role" not in fieldnames:
+            for row in rows:
+                row["role"] = _role(row.get("username") or "", None)
+            _write_users(self.path, rows, fieldnames + ["role"])
+
+        users = {}
+        for row in rows:
+            username = row.get("username") or ""
+            # The first row wins if a username is listed twice
+            users.setdefault(username, User(
+                username=username,
+                password=row.get("password") or "",
+                status=(row.get("status", "active") or "").strip(),
+                role=_role(username, row.get("role") or ""),
+            ))
+        self._users = users
+        self._signature = self._file_signature()
+
+    def _current(self):
+        if self._users is not None and self._file_signature() == self._signature:
+            return self._users
+        with self._lock:
+            if self._users is None or self._file_signature() != self._signature:
+                self._load()
+            return self._users
+
+    def get(self, username):
+        """The User called username, or None"""
+        return self._current().get(username)
+
+    def check_password(self, user, password):
+        """
+        True / False once the password has been checked (waits for a free
+        verifier worker), None if too many sign-ins are being checked right now
+        """
+        verifier = get_password_verifier()
+        ok = verifier.verify(password, user.password)
+        if ok and needs_rehash(user.password):
+            verifier.rehash(password, lambda stored: self.set_password(user.username, stored, user.password))
+        return ok
+
+    def set_password(self, username, stored, previous=None):
+        """
+        Writes a new stored password for username. With `previous`, only if
+        the row still holds that value - a newer change wins over a migration
+        """
+        with self._lock:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                fieldnames = list(reader.fieldnames or [])
+                rows = list(reader)
+            row = next((row for row in rows if (row.get("username") or "") == username), None)
+            if row is None or (previous is not None and row.get("password") != previous):
+                return False
+            row["password"] = stored
+            _write_users(self.path, rows, fieldnames)
+            self._load()
+            return True
+
+
+@process_wide
+def get_user_directory():
+    """Returns the process-wide user directory"""
+    return UserDirectory()
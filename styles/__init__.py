@@ -1 +1,2 @@
+from .bundle import load_css
 from .main import load_css as load_global_css
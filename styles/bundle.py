@@ -0,0 +1,98 @@
+# styles/bundle.py
+"""
+One minified style sheet per page type.
+
+Each module in styles/ holds its CSS in a CSS constant. BUNDLES says which
+of them a page type uses, and the bundles are joined and minified once per
+process, on first import.
+
+load_css(name) then adds the bundle to the page:
+
+- with static file serving on (server.enableStaticServing), the bundle is
+  written once to static/css/<name>.<content hash>.css and each rerun only
+  sends a one-line @import of that URL. The browser downloads the sheet
+  once, and the hash in the name keeps a changed bundle from being served
+  stale
+- otherwise the minified bundle itself goes out, inline
+
+Either way it is sent through st.html as a style-only element, which
+Streamlit puts in the event container, so it takes no room on the page.
+Streamlit drops whatever a rerun doesn't send again, so the (small)
+reference is still sent on every full rerun. Fragment reruns don't send
+it at all.
+"""
+import hashlib
+import os
+import re
+import threading
+
+import streamlit as st
+
+from . import dashboard, edit_idea, header, home, login, main
+
+STATIC_CSS_DIR = os.path.join("static", "css")
+
+# Page type -> the style sheets it needs, in cascade order
+BUNDLES = {
+    "app": [main.CSS],
+    "header": [header.CSS],
+    "dashboard": [header.CSS, dashboard.CSS],
+    "edit_idea": [header.CSS, edit_idea.CSS],
+    "home": [header.CSS, home.CSS],
+    "login": [login.CSS],
+}
+
+
+def minify(css):
+    """Drops comments and the whitespace CSS doesn't need"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+_bundles = {name: minify("\n".join(sheets)) for name, sheets in BUNDLES.items()}
+# name -> URL of the written bundle, or None if it couldn't be written
+_urls = {}
+_urls_lock = threading.Lock()
+
+
+def _static_serving():
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def _url(name):
+    """app/static URL of bundle `name`, writing the file on first use"""
+    if name not in _urls:
+        with _urls_lock:
+            if name not in _urls:
+                css = _bundles[name]
+                filename = f"{name}.{hashlib.sha256(css.encode()).hexdigest()[:12]}.css"
+                path = os.path.join(STATIC_CSS_DIR, filename)
+                try:
+                    if not os.path.exists(path):
+                        os.makedirs(STATIC_CSS_DIR, exist_ok=True)
+                        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                        with open(tmp_path, "w", encoding="utf-8") as f:
+                            f.write(css)
+                        os.replace(tmp_path, path)
+                    _urls[name] = f"app/static/css/{filename}"
+                except OSError:
+                    _urls[name] = None
+    return _urls[name]
+
+
+def markup(name):
+    """The <style> element that adds bundle `name` to a page"""
+    url = _url(name) if _static_serving() else None
+    if url is None:
+        return f"<style>{_bundles[name]}</style>"
+    return f'<style>@import url("{url}");</style>'
+
+
+def load_css(name):
+    """Adds the style sheets of page type `name` (see BUNDLES) to the page"""
+    st.html(markup(name))
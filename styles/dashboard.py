@@ -1,10 +1,4 @@
-import streamlit as st
-
-
-def load_css():
-    """Loads CSS specific to the dashboard page"""
-    st.markdown("""
-    <style>
+CSS = """
     /* Add any dashboard-specific styling here if needed */
     .dashboard-content {
         padding: 20px;
@@ -16,5 +10,4 @@ def load_css():
     .dashboard-section {
         margin-bottom: 20px;
     }
-    </style>
-    """, unsafe_allow_html=True)
+"""
@@ -1,9 +1,4 @@
-import streamlit as st
-
-
-def load_css():
-    st.markdown("""
-    <style>
+CSS = """
         /*
          Streamlit wraps inputs in extra divs, so we need to style those wrappers
          to get clean borders with rounded corners that actually show up.
@@ -91,5 +86,4 @@ def load_css():
             margin-left: auto;
             font-size: 0.85rem;
         }
-    </style>
-    """, unsafe_allow_html=True)
+"""
@@ -1,10 +1,4 @@
-import streamlit as st
-
-
-def load_css():
-    st.markdown(
-        """
-    <style>
+CSS = """
       :root { 
         --blue: #1677ff; 
       }
@@ -89,7 +83,4 @@ def load_css():
       .navbar .sep {
         opacity: 0.9;
       }
-    </style>
-    """,
-        unsafe_allow_html=True,
-    )
+"""
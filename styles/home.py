@@ -1,10 +1,5 @@
 # styles/home.py
-import streamlit as st
-
-
-def load_css():
-    st.markdown("""
-    <style>
+CSS = """
       /* Each row in the home table */
       .home-row {border:1px solid #e9edf3; border-radius:12px; padding:12px; margin-bottom:10px; background:#fff;}
       .home-row:hover {box-shadow:0 2px 10px rgba(0,0,0,0.06);}
@@ -79,5 +74,4 @@ def load_css():
         margin-left: 10px;
         margin-top: 28px;
       }
-    </style>
-    """, unsafe_allow_html=True)
+"""
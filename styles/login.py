@@ -1,11 +1,6 @@
-import streamlit as st
+from . import bundle
 
-
-
-def load_css():
-    """Loads up the CSS for the login page"""
-    st.markdown("""
-    <style>
+CSS = """
     /* Get rid of that default padding Streamlit adds */
     .main > div {
         padding-top: 3rem;
@@ -251,5 +246,9 @@ def load_css():
     }
     
     /* ==================== END MODAL STUFF ==================== */
-    </style>
-    """, unsafe_allow_html=True)
+"""
+
+
+def load_css():
+    """Loads up the CSS for the login page"""
+    bundle.load_css("login")
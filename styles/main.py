@@ -1,10 +1,6 @@
-import streamlit as st
+from . import bundle
 
-
-def load_css():
-    """Loads the base CSS that applies to the whole app"""
-    st.markdown("""
-    <style>
+CSS = """
       :root {
         --blue: #0a74ff;
         --blue-dark: #075fd1;
@@ -40,5 +36,9 @@ def load_css():
         border-radius: 12px; 
         font-weight: 600; 
       }
-    </style>
-    """, unsafe_allow_html=True)
+"""
+
+
+def load_css():
+    """Loads the base CSS that applies to the whole app"""
+    bundle.load_css("app")